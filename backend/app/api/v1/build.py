@@ -3,23 +3,74 @@ Build endpoint - Strategy Builder API
 Combines Uniswap V3 Subgraph (primary) with DeBank (secondary) for complete coverage.
 """
 
-from fastapi import APIRouter, Query
-from pydantic import BaseModel
-from typing import Any, Optional
+from fastapi import APIRouter, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, Field, PrivateAttr, TypeAdapter, ValidationError, model_validator
+from typing import Annotated, Any, Callable, Coroutine, Optional
 import logging
 import asyncio
-from datetime import datetime, timedelta
-
-from backend.services.discovery import TransactionDiscoveryService
-from backend.services.thegraph import TheGraphService
-from backend.services.gmx_subgraph import GMXSubgraphService
+import math
+import re
+import sys
+import time
+import orjson
+import ormsgpack
+from operator import attrgetter, mul
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from itertools import groupby
+from datetime import datetime, timedelta, timezone
+
+from backend.services.discovery import get_discovery_service
+from backend.services.thegraph import get_thegraph_service
+from backend.services.gmx_subgraph import get_gmx_subgraph_service
 from backend.services.debank import get_debank_service
-from backend.services.coingecko import CoinGeckoService
-from backend.core.config import settings
+from backend.services.coingecko import get_coingecko_service
+from backend.core.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/build", tags=["build"])
+
+
+class ORJSONRequest(Request):
+    """Request whose JSON body is parsed with orjson instead of stdlib json."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so
+            # FastAPI still turns malformed bodies into a 422
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class ORJSONRoute(APIRoute):
+    """Route that hands FastAPI's body validation an ORJSONRequest."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        original_route_handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            # Read through the original request so its body stays cached for
+            # exception handlers, then replay it to the ORJSONRequest
+            body = await request.body()
+
+            async def receive() -> dict[str, Any]:
+                return {"type": "http.request", "body": body, "more_body": False}
+
+            return await original_route_handler(ORJSONRequest(request.scope, receive))
+
+        return route_handler
+
+
+router = APIRouter(
+    prefix="/build",
+    tags=["build"],
+    default_response_class=ORJSONResponse,
+    route_class=ORJSONRoute,
+)
 
 CHAIN_NAMES = {
     "eth": "Ethereum",
@@ -30,47 +81,231 @@ CHAIN_NAMES = {
     "bsc": "BNB Chain",
 }
 
+# Repeat dashboard loads of /uniswap-lp within this window skip the upstream calls
+_uniswap_lp_cache = TTLCache(ttl_seconds=60)
+
+# DeBank project ids that belong to LP protocols
+LP_PROJECT_RE = re.compile(r"uniswap|pancake|sushi|aero|curve|balancer", re.IGNORECASE)
+
 
-def _format_position_from_subgraph(position: dict) -> dict:
-    """Format a subgraph position into our standard format."""
-    pool = position.get("pool", {})
-    token0 = pool.get("token0", {})
-    token1 = pool.get("token1", {})
-    tx = position.get("transaction", {})
+# Shared read-only fallback for missing nested subgraph objects
+_EMPTY: dict = {}
 
-    liquidity = int(position.get("liquidity", 0))
-    fee_tier = int(pool.get("feeTier", 0)) / 10000
 
+@dataclass(slots=True)
+class FormattedPosition:
+    """Subgraph position in our standard format (slots keep large wallets lean)."""
+    position_id: Optional[str]
+    pool_address: str
+    chain: str
+    chain_name: str
+    token0: str
+    token1: str
+    token0_symbol: str
+    token1_symbol: str
+    fee_tier: str
+    status: str
+    liquidity: str
+    deposited_token0: float
+    deposited_token1: float
+    withdrawn_token0: float
+    withdrawn_token1: float
+    collected_fees_token0: float
+    collected_fees_token1: float
+    mint_timestamp: int
+    mint_block: int
+    data_source: str = "subgraph"
+    transactions: list = field(default_factory=list)  # Populated from DeBank if available
+
+
+# Formatted positions keyed on the fields that change over a position's life
+_formatted_position_cache = TTLCache(ttl_seconds=600, max_entries=4096)
+
+
+def _format_position_from_subgraph(position: dict) -> FormattedPosition:
+    """
+    Format a subgraph position into our standard format.
+
+    Memoized across requests; hits return a copy with its own transactions list.
+    """
+    cache_key = (
+        position.get("id"),
+        position.get("liquidity"),
+        position.get("depositedToken0"),
+        position.get("depositedToken1"),
+        position.get("withdrawnToken0"),
+        position.get("withdrawnToken1"),
+        position.get("collectedFeesToken0"),
+        position.get("collectedFeesToken1"),
+    )
+    cached = _formatted_position_cache.get(cache_key)
+    if cached is None:
+        cached = _build_formatted_position(position)
+        _formatted_position_cache.set(cache_key, cached)
+    return replace(cached, transactions=[])
+
+
+def _build_formatted_position(position: dict) -> FormattedPosition:
+    """Uncached body of _format_position_from_subgraph."""
+    pool = position.get("pool") or _EMPTY
+    token0 = pool.get("token0") or _EMPTY
+    token1 = pool.get("token1") or _EMPTY
+    tx = position.get("transaction") or _EMPTY
+
+    liquidity = int(position.get("liquidity") or 0)
+    fee_tier = int(pool.get("feeTier") or 0) / 10000
+
+    return FormattedPosition(
+        position_id=position.get("id"),
+        pool_address=pool.get("id", "").lower(),  # canonical lowercase key
+        chain="eth",  # Ethereum mainnet subgraph
+        chain_name="Ethereum",
+        token0=token0.get("id", ""),
+        token1=token1.get("id", ""),
+        token0_symbol=token0.get("symbol", "UNKNOWN"),
+        token1_symbol=token1.get("symbol", "UNKNOWN"),
+        fee_tier=f"{fee_tier}%",
+        status="ACTIVE" if liquidity > 0 else "CLOSED",
+        liquidity=str(liquidity),
+        deposited_token0=float(position.get("depositedToken0", 0)),
+        deposited_token1=float(position.get("depositedToken1", 0)),
+        withdrawn_token0=float(position.get("withdrawnToken0", 0)),
+        withdrawn_token1=float(position.get("withdrawnToken1", 0)),
+        collected_fees_token0=float(position.get("collectedFeesToken0", 0)),
+        collected_fees_token1=float(position.get("collectedFeesToken1", 0)),
+        mint_timestamp=int(tx.get("timestamp", 0)),
+        mint_block=int(tx.get("blockNumber", 0)),
+    )
+
+
+def _format_position_light(position: dict) -> dict:
+    """
+    Per-position fields kept in /uniswap-lp pool groups.
+
+    Same conversions as _format_position_from_subgraph, minus the pool and
+    withdrawal fields that the grouped response never reads.
+    """
+    liquidity = int(position.get("liquidity") or 0)
     return {
         "position_id": position.get("id"),
-        "pool_address": pool.get("id", ""),
-        "chain": "eth",  # Ethereum mainnet subgraph
-        "chain_name": "Ethereum",
-        "token0": token0.get("id", ""),
-        "token1": token1.get("id", ""),
-        "token0_symbol": token0.get("symbol", "UNKNOWN"),
-        "token1_symbol": token1.get("symbol", "UNKNOWN"),
-        "fee_tier": f"{fee_tier}%",
         "status": "ACTIVE" if liquidity > 0 else "CLOSED",
         "liquidity": str(liquidity),
         "deposited_token0": float(position.get("depositedToken0", 0)),
         "deposited_token1": float(position.get("depositedToken1", 0)),
-        "withdrawn_token0": float(position.get("withdrawnToken0", 0)),
-        "withdrawn_token1": float(position.get("withdrawnToken1", 0)),
         "collected_fees_token0": float(position.get("collectedFeesToken0", 0)),
         "collected_fees_token1": float(position.get("collectedFeesToken1", 0)),
-        "mint_timestamp": int(tx.get("timestamp", 0)),
-        "mint_block": int(tx.get("blockNumber", 0)),
+        "mint_timestamp": int((position.get("transaction") or _EMPTY).get("timestamp", 0)),
+    }
+
+
+def _new_pool_bucket(pool: dict) -> dict:
+    """Pool-level /uniswap-lp entry (empty positions list) from a subgraph pool."""
+    token0 = pool.get("token0") or _EMPTY
+    token1 = pool.get("token1") or _EMPTY
+    return {
+        "pool_address": pool.get("id", "").lower(),
+        "chain": "eth",  # Ethereum mainnet subgraph
+        "chain_name": "Ethereum",
+        "token0": token0.get("id", ""),
+        "token1": token1.get("id", ""),
+        "token0_symbol": token0.get("symbol", "UNKNOWN"),
+        "token1_symbol": token1.get("symbol", "UNKNOWN"),
+        "fee_tier": f"{int(pool.get('feeTier') or 0) / 10000}%",
+        "positions": [],
         "data_source": "subgraph",
-        "transactions": []  # Will be populated from DeBank if available
+        "debank_tx_count": 0,
+        "transactions": []
+    }
+
+
+# Position counts above this are formatted in a worker thread so the parsing
+# doesn't stall other requests on the event loop
+FORMAT_IN_THREAD_THRESHOLD = 100
+
+
+def _group_positions_by_pool(
+    subgraph_positions: list[dict]
+) -> tuple[dict[str, dict], dict[str, int], int]:
+    """
+    Group subgraph positions into /uniswap-lp pool entries.
+
+    Pool fields are built once per pool; latest activity per pool and the
+    active position count are tracked on the way.
+
+    Returns:
+        (positions_by_pool, last_activity_by_pool, active_positions)
+    """
+    positions_by_pool: dict[str, dict] = {}
+    last_activity_by_pool: dict[str, int] = {}
+    active_positions = 0
+    for pos in subgraph_positions:
+        pool = pos.get("pool") or _EMPTY
+        pool_key = sys.intern(pool.get("id", "").lower())
+        bucket = positions_by_pool.get(pool_key)
+        if bucket is None:
+            bucket = positions_by_pool[pool_key] = _new_pool_bucket(pool)
+            last_activity_by_pool[pool_key] = 0
+        light = _format_position_light(pos)
+        bucket["positions"].append(light)
+        if light["mint_timestamp"] > last_activity_by_pool[pool_key]:
+            last_activity_by_pool[pool_key] = light["mint_timestamp"]
+        if light["status"] == "ACTIVE":
+            active_positions += 1
+    return positions_by_pool, last_activity_by_pool, active_positions
+
+
+def _index_uniswap_txs(transactions: list[dict]) -> dict[str, dict]:
+    """Build dict of tx_hash -> tx data for Uniswap transactions."""
+    return {
+        tx_hash: tx
+        for tx in transactions
+        if (project_id := tx.get("project_id")) and "uniswap" in project_id.lower()
+        and (tx_hash := (tx.get("id") or "").lower())
     }
 
 
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+
+def _wants_msgpack(request: Request) -> bool:
+    """True if the client asked for MessagePack via the Accept header."""
+    return MSGPACK_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _encode_response(request: Request, payload: dict[str, Any]) -> Response:
+    """Encode as MessagePack when requested, JSON (orjson) otherwise."""
+    if _wants_msgpack(request):
+        return Response(ormsgpack.packb(payload), media_type=MSGPACK_MEDIA_TYPE)
+    return ORJSONResponse(payload)
+
+
+def _stream_uniswap_lp(payload: dict[str, Any]) -> StreamingResponse:
+    """
+    Stream a /uniswap-lp success payload one pool at a time.
+
+    Encoding each pool separately lets the first bytes go out before the
+    whole response is serialized, which matters for wallets with many pools.
+    """
+    data = payload["data"]
+
+    def chunks():
+        yield b'{"status":"success","data":{"pools":['
+        for i, pool in enumerate(data["pools"]):
+            if i:
+                yield b","
+            yield orjson.dumps(pool)
+        yield b'],"summary":' + orjson.dumps(data["summary"])
+        yield b',"data_sources":' + orjson.dumps(data["data_sources"]) + b"}}"
+
+    return StreamingResponse(chunks(), media_type="application/json")
+
+
 @router.get("/uniswap-lp")
 async def get_uniswap_lp_positions(
+    request: Request,
     wallet: str = Query(..., description="Wallet address"),
     force_refresh: bool = Query(False, description="Force refresh from DeBank")
-) -> dict[str, Any]:
+) -> Response:
     """
     Get ALL Uniswap V3 LP positions using subgraph as primary source.
 
@@ -79,131 +314,105 @@ async def get_uniswap_lp_positions(
     2. Queries DeBank for transaction history (for enrichment)
     3. Merges data and shows source for each position
     4. Highlights positions that DeBank missed
+
+    Responses are cached per wallet for 60s; force_refresh bypasses the cache.
+    Send `Accept: application/msgpack` for a MessagePack body.
     """
+    cache_key = wallet.lower()
+    if not force_refresh:
+        cached = _uniswap_lp_cache.get(cache_key)
+        if cached is not None:
+            if _wants_msgpack(request):
+                return _encode_response(request, cached)
+            return _stream_uniswap_lp(cached)
+
     try:
-        # Initialize services
-        thegraph = TheGraphService(settings.thegraph_api_key)
-        discovery = TransactionDiscoveryService()
+        # Shared services (connection pools live for the app's lifetime)
+        thegraph = await get_thegraph_service()
+        discovery = await get_discovery_service()
 
         # Step 1: Get ALL positions from Uniswap V3 subgraph (PRIMARY SOURCE)
-        logger.info(f"Querying Uniswap V3 subgraph for positions...")
-        subgraph_positions = await thegraph.get_positions_by_owner(wallet)
-
-        # Format subgraph positions
-        positions_by_pool: dict[str, dict] = {}
-        for pos in subgraph_positions:
-            formatted = _format_position_from_subgraph(pos)
-            pool_key = formatted["pool_address"].lower()
-
-            # Group by pool - if multiple positions in same pool, keep track
-            if pool_key not in positions_by_pool:
-                positions_by_pool[pool_key] = {
-                    "pool_address": formatted["pool_address"],
-                    "chain": formatted["chain"],
-                    "chain_name": formatted["chain_name"],
-                    "token0": formatted["token0"],
-                    "token1": formatted["token1"],
-                    "token0_symbol": formatted["token0_symbol"],
-                    "token1_symbol": formatted["token1_symbol"],
-                    "fee_tier": formatted["fee_tier"],
-                    "positions": [],
-                    "data_source": "subgraph",
-                    "debank_tx_count": 0,
-                    "transactions": []
-                }
-
-            positions_by_pool[pool_key]["positions"].append({
-                "position_id": formatted["position_id"],
-                "status": formatted["status"],
-                "liquidity": formatted["liquidity"],
-                "deposited_token0": formatted["deposited_token0"],
-                "deposited_token1": formatted["deposited_token1"],
-                "collected_fees_token0": formatted["collected_fees_token0"],
-                "collected_fees_token1": formatted["collected_fees_token1"],
-                "mint_timestamp": formatted["mint_timestamp"]
-            })
-
-        logger.info(f"Subgraph found {len(subgraph_positions)} positions across {len(positions_by_pool)} pools")
-
         # Step 2: Get transactions from DeBank (SECONDARY SOURCE for history)
-        logger.info(f"Querying DeBank for transaction history...")
+        # The two are independent, so fetch them concurrently
+        logger.info(f"Querying Uniswap V3 subgraph and DeBank transaction history...")
         since = datetime.now() - timedelta(days=365)
-        debank_result = await discovery.discover_transactions(
-            wallet_address=wallet,
-            since=since,
-            force_refresh=force_refresh,
-            max_pages=500
+        subgraph_positions, debank_result = await asyncio.gather(
+            thegraph.get_positions_by_owner(wallet),
+            discovery.discover_transactions(
+                wallet_address=wallet,
+                since=since,
+                force_refresh=force_refresh,
+                max_pages=500
+            )
         )
 
+        # Group subgraph positions by pool (off the event loop for big wallets)
+        if len(subgraph_positions) > FORMAT_IN_THREAD_THRESHOLD:
+            grouped = await asyncio.to_thread(_group_positions_by_pool, subgraph_positions)
+        else:
+            grouped = _group_positions_by_pool(subgraph_positions)
+        positions_by_pool, last_activity_by_pool, active_positions = grouped
+
+        logger.info(f"Subgraph found {len(subgraph_positions)} positions across {len(positions_by_pool)} pools")
+
         all_txs = debank_result["transactions"]
 
         # Filter for LP transactions
-        lp_projects = ['uniswap', 'pancake', 'sushi', 'aero', 'curve', 'balancer']
         lp_txs = [
             tx for tx in all_txs
-            if any(lp in (tx.get("project_id") or "").lower() for lp in lp_projects)
+            if (project_id := tx.get("project_id")) and LP_PROJECT_RE.search(project_id)
         ]
 
+        # Newest first, so each pool's transaction list comes out already sorted
+        lp_txs.sort(key=lambda tx: tx.get("time_at") or 0, reverse=True)
+
         logger.info(f"DeBank returned {len(all_txs)} total txs, {len(lp_txs)} LP txs")
 
-        # Step 3: Match DeBank transactions to subgraph positions
-        debank_pools: set[str] = set()
+        # Step 3: Match DeBank transactions to subgraph positions.
+        # The same few counterparty addresses repeat across thousands of txs,
+        # so each raw address is lowercased (and interned) only once.
+        txs_by_pool: dict[str, list[dict]] = defaultdict(list)
+        pool_key_by_addr: dict[str, str] = {}
         for tx in lp_txs:
-            pool_addr = tx.get("other_addr")
-            if not pool_addr:
+            other_addr = tx.get("other_addr")
+            if not other_addr:
                 continue
-
-            pool_key = pool_addr.lower()
-            debank_pools.add(pool_key)
-
+            pool_key = pool_key_by_addr.get(other_addr)
+            if pool_key is None:
+                pool_key = pool_key_by_addr[other_addr] = sys.intern(other_addr.lower())
             if pool_key in positions_by_pool:
-                # Add transaction to existing pool
-                positions_by_pool[pool_key]["debank_tx_count"] += 1
-                positions_by_pool[pool_key]["data_source"] = "both"
-                positions_by_pool[pool_key]["transactions"].append({
+                tx_info = tx.get("tx") or _EMPTY
+                txs_by_pool[pool_key].append({
                     "id": tx.get("id"),
-                    "type": tx.get("tx", {}).get("name") or tx.get("cate_id") or "unknown",
+                    "type": tx_info.get("name") or tx.get("cate_id") or "unknown",
                     "timestamp": tx.get("time_at"),
-                    "hash": tx.get("tx", {}).get("hash", ""),
+                    "hash": tx_info.get("hash", ""),
                 })
 
-        # Step 4: Identify pools DeBank missed
-        subgraph_only_pools = set(positions_by_pool.keys()) - debank_pools
-
-        # Build final results
-        pools_list = []
-        for pool_key, pool_data in positions_by_pool.items():
-            pool_data["debank_missed"] = pool_key in subgraph_only_pools
+        for pool_key, pool_txs in txs_by_pool.items():
+            pool_data = positions_by_pool[pool_key]
+            pool_data["debank_tx_count"] = len(pool_txs)
+            pool_data["data_source"] = "both"
+            pool_data["transactions"] = pool_txs
+            # Newest first, so the head is the pool's latest DeBank activity
+            newest_tx_ts = pool_txs[0]["timestamp"] or 0
+            if newest_tx_ts > last_activity_by_pool[pool_key]:
+                last_activity_by_pool[pool_key] = newest_tx_ts
+
+        # Step 4: Pools DeBank missed are the ones no LP tx matched
+        for pool_data in positions_by_pool.values():
+            pool_data["debank_missed"] = pool_data["debank_tx_count"] == 0
             pool_data["position_count"] = len(pool_data["positions"])
 
-            # Sort transactions by timestamp
-            pool_data["transactions"].sort(
-                key=lambda x: x.get("timestamp", 0),
-                reverse=True
-            )
-
-            pools_list.append(pool_data)
-
         # Sort by most recent activity
-        pools_list.sort(
-            key=lambda p: max(
-                [pos["mint_timestamp"] for pos in p["positions"]] +
-                [tx.get("timestamp", 0) for tx in p["transactions"]],
-                default=0
-            ),
+        pools_list = sorted(
+            positions_by_pool,
+            key=last_activity_by_pool.__getitem__,
             reverse=True
         )
+        pools_list = [positions_by_pool[pool_key] for pool_key in pools_list]
 
-        # Cleanup
-        await thegraph.close()
-        await discovery.close()
-
-        # Count active vs closed positions
-        active_positions = sum(
-            1 for pool in positions_by_pool.values()
-            for pos in pool["positions"]
-            if pos["status"] == "ACTIVE"
-        )
+        # Count closed positions
         closed_positions = len(subgraph_positions) - active_positions
 
         # Build summary
@@ -217,7 +426,7 @@ async def get_uniswap_lp_positions(
             "note": "DeBank returns Position Manager address, not pool address - subgraph is primary source for LP positions"
         }
 
-        return {
+        payload = {
             "status": "success",
             "data": {
                 "pools": pools_list,
@@ -228,38 +437,46 @@ async def get_uniswap_lp_positions(
                 }
             }
         }
+        _uniswap_lp_cache.set(cache_key, payload)
+
+        if _wants_msgpack(request):
+            return _encode_response(request, payload)
+        return _stream_uniswap_lp(payload)
 
     except Exception as e:
         logger.error(f"Error: {e}", exc_info=True)
-        return {
+        return ORJSONResponse({
             "status": "error",
             "detail": {"error": str(e)}
-        }
+        })
 
 
 @router.get("/subgraph-only")
 async def get_subgraph_positions(
     wallet: str = Query(..., description="Wallet address")
-) -> dict[str, Any]:
+) -> ORJSONResponse:
     """
     Get positions directly from Uniswap V3 subgraph only.
     Useful for debugging and comparing with DeBank.
     """
     try:
-        thegraph = TheGraphService(settings.thegraph_api_key)
+        thegraph = await get_thegraph_service()
         positions = await thegraph.get_positions_by_owner(wallet)
-        await thegraph.close()
 
-        # Format for display
-        formatted = []
-        for pos in positions:
-            formatted.append(_format_position_from_subgraph(pos))
+        # Format for display (off the event loop for big wallets)
+        if len(positions) > FORMAT_IN_THREAD_THRESHOLD:
+            formatted = await asyncio.to_thread(
+                lambda: [_format_position_from_subgraph(pos) for pos in positions]
+            )
+        else:
+            formatted = [_format_position_from_subgraph(pos) for pos in positions]
 
         # Count active vs closed
-        active = sum(1 for p in formatted if p["status"] == "ACTIVE")
-        closed = sum(1 for p in formatted if p["status"] == "CLOSED")
+        active = sum(1 for p in formatted if p.status == "ACTIVE")
+        closed = sum(1 for p in formatted if p.status == "CLOSED")
 
-        return {
+        # orjson serializes the slotted dataclasses natively
+        return ORJSONResponse({
             "status": "success",
             "data": {
                 "positions": formatted,
@@ -268,14 +485,14 @@ async def get_subgraph_positions(
                 "closed": closed,
                 "source": "Uniswap V3 Subgraph (Ethereum Mainnet)"
             }
-        }
+        })
 
     except Exception as e:
         logger.error(f"Error: {e}", exc_info=True)
-        return {
+        return ORJSONResponse({
             "status": "error",
             "detail": {"error": str(e)}
-        }
+        })
 
 
 @router.get("/position-history/{position_id}")
@@ -299,31 +516,31 @@ async def get_position_history(
     - USD values at time of transaction (from Subgraph prices)
     """
     try:
-        thegraph = TheGraphService(settings.thegraph_api_key)
+        thegraph = await get_thegraph_service()
 
-        # Fetch DeBank transactions for accurate token amounts
-        discovery = TransactionDiscoveryService()
+        # Position structure (Subgraph) and DeBank transactions (for accurate
+        # token amounts) are independent, so fetch them concurrently
+        discovery = await get_discovery_service()
         since = datetime.now() - timedelta(days=365 * 3)  # 3 years of history
-        debank_result = await discovery.discover_transactions(
-            wallet_address=wallet,
-            since=since,
-            max_pages=100
+        structure, debank_result = await asyncio.gather(
+            thegraph.get_position_structure(position_id),
+            discovery.discover_transactions(
+                wallet_address=wallet,
+                since=since,
+                max_pages=100
+            )
         )
 
-        # Build dict of tx_hash -> tx data for Uniswap transactions
-        debank_txs = {}
-        for tx in debank_result.get("transactions", []):
-            if "uniswap" in (tx.get("project_id") or "").lower():
-                tx_hash = tx.get("id", "").lower()
-                if tx_hash:
-                    debank_txs[tx_hash] = tx
+        debank_txs = _index_uniswap_txs(debank_result.get("transactions", []))
 
         logger.info(f"Loaded {len(debank_txs)} Uniswap transactions from DeBank for amounts")
-        await discovery.close()
 
         # Get position history with DeBank amounts + Subgraph prices
-        history = await thegraph.get_position_history(position_id, debank_txs=debank_txs)
-        await thegraph.close()
+        history = None
+        if structure is not None:
+            history = await thegraph.get_position_history(
+                position_id, debank_txs=debank_txs, structure=structure
+            )
 
         if not history:
             return {
@@ -350,8 +567,9 @@ async def get_position_history(
 
 @router.get("/gmx-positions")
 async def get_gmx_positions(
+    request: Request,
     wallet: str = Query(..., description="Wallet address")
-) -> dict[str, Any]:
+) -> Response:
     """
     Get ALL GMX V2 perpetual positions (active and closed) on Arbitrum.
 
@@ -363,11 +581,11 @@ async def get_gmx_positions(
     - P&L: GMX Subgraph (basePnlUsd)
 
     Returns positions grouped by positionKey with summary stats.
+    Send `Accept: application/msgpack` for a MessagePack body.
     """
     try:
-        gmx = GMXSubgraphService()
+        gmx = await get_gmx_subgraph_service()
         positions = await gmx.get_all_positions(wallet)
-        await gmx.close()
 
         # Count active vs closed
         active = sum(1 for p in positions if p["status"] == "ACTIVE")
@@ -377,7 +595,7 @@ async def get_gmx_positions(
         total_pnl = sum(p["total_pnl_usd"] for p in positions)
         total_size = sum(p["current_size_usd"] for p in positions)
 
-        return {
+        return _encode_response(request, {
             "status": "success",
             "data": {
                 "positions": positions,
@@ -395,20 +613,21 @@ async def get_gmx_positions(
                     "fees": "GMX Subgraph (borrowing/funding/position fees)",
                 }
             }
-        }
+        })
 
     except Exception as e:
         logger.error(f"Error getting GMX positions: {e}", exc_info=True)
-        return {
+        return ORJSONResponse({
             "status": "error",
             "detail": {"error": str(e)}
-        }
+        })
 
 
 @router.get("/gmx-trades")
 async def get_gmx_trades(
+    request: Request,
     wallet: str = Query(..., description="Wallet address")
-) -> dict[str, Any]:
+) -> Response:
     """
     Get ALL GMX V2 trades as a flat list (no position grouping).
 
@@ -417,11 +636,12 @@ async def get_gmx_trades(
 
     Returns:
         List of trades with: market, side, action, size, price, pnl, fees, tx
+
+    Send `Accept: application/msgpack` for a MessagePack body.
     """
     try:
-        gmx = GMXSubgraphService()
+        gmx = await get_gmx_subgraph_service()
         trades = await gmx.get_all_trades(wallet)
-        await gmx.close()
 
         # Calculate summary stats
         total_pnl = sum(t["pnl_usd"] for t in trades)
@@ -430,7 +650,8 @@ async def get_gmx_trades(
         longs = sum(1 for t in trades if t["is_long"])
         shorts = total_trades - longs
 
-        return {
+        # Encode directly; skips the jsonable_encoder walk over every item
+        return _encode_response(request, {
             "status": "success",
             "data": {
                 "trades": trades,
@@ -443,14 +664,14 @@ async def get_gmx_trades(
                 },
                 "data_source": "GMX Synthetics Subgraph (Arbitrum)"
             }
-        }
+        })
 
     except Exception as e:
         logger.error(f"Error getting GMX trades: {e}", exc_info=True)
-        return {
+        return ORJSONResponse({
             "status": "error",
             "detail": {"error": str(e)}
-        }
+        })
 
 
 @router.get("/gmx-position-history/{position_key:path}")
@@ -476,9 +697,8 @@ async def get_gmx_position_history(
     - Fees paid
     """
     try:
-        gmx = GMXSubgraphService()
+        gmx = await get_gmx_subgraph_service()
         history = await gmx.get_position_history_by_key(position_key)
-        await gmx.close()
 
         if not history:
             return {
@@ -519,7 +739,8 @@ class StrategyLPItem(BaseModel):
 
 class StrategyGMXTradeItem(BaseModel):
     """GMX trade item for strategy loading."""
-    model_config = {"extra": "ignore"}  # Ignore extra fields from frontend
+    # Ignore extra fields from frontend; items are read-only once parsed
+    model_config = {"extra": "ignore", "frozen": True}
 
     type: str = "gmx_trade"
     tx_hash: str
@@ -530,20 +751,28 @@ class StrategyGMXTradeItem(BaseModel):
     market_name: Optional[str] = None  # Legacy field - "ETH/USD" format
     side: str
     action: str
-    size_delta_usd: float
+    # Strict floats: the frontend sends numbers, so skip string coercion
+    size_delta_usd: Annotated[float, Field(strict=True)]
     collateral_usd: float = 0.0  # Optional - default to 0
-    execution_price: float
-    pnl_usd: float
+    execution_price: Annotated[float, Field(strict=True)]
+    pnl_usd: Annotated[float, Field(strict=True)]
     timestamp: int
 
-    def get_market(self) -> str:
-        """Get market symbol, deriving from market_name if needed."""
+    # Resolved once at validation time; the model is frozen
+    _market_resolved: str = PrivateAttr(default="UNKNOWN")
+
+    @model_validator(mode="after")
+    def _resolve_market(self) -> "StrategyGMXTradeItem":
         if self.market:
-            return self.market
-        if self.market_name:
+            self._market_resolved = self.market
+        elif self.market_name:
             # Extract "ETH" from "ETH/USD" or "ETH/USD [1]"
-            return self.market_name.split("/")[0].strip()
-        return "UNKNOWN"
+            self._market_resolved = self.market_name.split("/", 1)[0].strip()
+        return self
+
+    def get_market(self) -> str:
+        """Get market symbol, deriving from market_name if needed."""
+        return self._market_resolved
 
 
 class StrategyLoadRequest(BaseModel):
@@ -554,6 +783,10 @@ class StrategyLoadRequest(BaseModel):
     force_refresh: bool = True  # Always fetch fresh data by default
 
 
+# Validates the raw strategy/load body in one pass (JSON parsing included)
+_STRATEGY_LOAD_ADAPTER = TypeAdapter(StrategyLoadRequest)
+
+
 @router.post("/strategy/debug")
 async def debug_strategy_request(request: dict[str, Any]) -> dict[str, Any]:
     """Debug endpoint to see raw request body."""
@@ -569,6 +802,82 @@ async def debug_strategy_request(request: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+_GMX_OPEN_ACTIONS = frozenset(("Open", "Increase"))
+_GMX_CLOSE_ACTIONS = frozenset(("Decrease", "Close"))
+_TRADE_SIZE = attrgetter("size_delta_usd")
+_TRADE_PRICE = attrgetter("execution_price")
+_TRADE_PNL = attrgetter("pnl_usd")
+_TRADE_TIMESTAMP = attrgetter("timestamp")
+
+
+# Wrapped tokens that trade as their underlying market
+_MARKET_ALIASES = {"WETH": "ETH", "WBTC": "BTC"}
+
+
+@lru_cache(maxsize=32)
+def normalize_market(symbol: str) -> str:
+    """Normalize market symbols for matching (ETH/WETH, BTC/WBTC)"""
+    upper = symbol.upper()
+    return _MARKET_ALIASES.get(upper, upper)
+
+
+def _index_perps_by_market_side(positions: list[dict]) -> dict[tuple[str, str], dict]:
+    """Index live perp positions by (normalized market, side), keeping the first match."""
+    index: dict[tuple[str, str], dict] = {}
+    for pos in positions:
+        key = (normalize_market((pos.get("base_token") or _EMPTY).get("symbol", "")), pos.get("side", ""))
+        index.setdefault(key, pos)
+    return index
+
+
+class _AggPos:
+    """Aggregated totals for one GMX position's selected trades."""
+    __slots__ = (
+        "position_key", "market", "market_address", "side", "is_long", "trades",
+        "total_size_usd", "weighted_entry_sum", "weighted_entry_size", "realized_pnl",
+        "total_fees_usd", "initial_margin_usd", "first_trade_timestamp", "last_trade_timestamp",
+    )
+
+    def __init__(self, key: str, group: list[StrategyGMXTradeItem]):
+        # group is in timestamp order (see aggregate_gmx_trades_to_positions)
+        first = group[0]
+        opens = [t for t in group if t.action in _GMX_OPEN_ACTIONS]
+        closes = [t for t in group if t.action in _GMX_CLOSE_ACTIONS]
+        opened_size = sum(map(_TRADE_SIZE, opens), 0.0)
+
+        self.position_key = key
+        # Resolved from market / market_name at validation time
+        self.market = first._market_resolved
+        self.market_address = first.market_address or ""
+        self.side = first.side
+        self.is_long = first.side == "Long"
+        self.trades = [
+            {
+                "tx_hash": t.tx_hash,
+                "action": t.action,
+                "size_delta_usd": t.size_delta_usd,
+                "collateral_usd": t.collateral_usd,
+                "execution_price": t.execution_price,
+                "pnl_usd": t.pnl_usd,
+                "timestamp": t.timestamp,
+            }
+            for t in group
+        ]
+        # Track size and entry price
+        self.total_size_usd = opened_size - sum(map(_TRADE_SIZE, closes), 0.0)
+        self.weighted_entry_sum = sum(map(mul, map(_TRADE_PRICE, opens), map(_TRADE_SIZE, opens)), 0.0)
+        self.weighted_entry_size = opened_size
+        self.realized_pnl = sum(map(_TRADE_PNL, closes), 0.0)
+        self.total_fees_usd = 0.0
+        # Earliest Open trade (with collateral) sets initial margin
+        self.initial_margin_usd = next(
+            (t.collateral_usd for t in opens if t.action == "Open" and t.collateral_usd != 0),
+            0.0
+        )
+        self.first_trade_timestamp = first.timestamp
+        self.last_trade_timestamp = group[-1].timestamp
+
+
 def aggregate_gmx_trades_to_positions(trades: list[StrategyGMXTradeItem]) -> list[dict[str, Any]]:
     """
     Aggregate individual GMX trades into position-level data for Ledger.
@@ -581,122 +890,93 @@ def aggregate_gmx_trades_to_positions(trades: list[StrategyGMXTradeItem]) -> lis
     if not trades:
         return []
 
-    positions: dict[str, dict[str, Any]] = {}
-
-    for trade in trades:
-        key = trade.position_key
-        # Use get_market() to derive market from market_name if needed
-        market = trade.get_market()
-        market_address = trade.market_address or ""
-
-        if key not in positions:
-            positions[key] = {
-                "position_key": key,
-                "market": market,
-                "market_address": market_address,
-                "side": trade.side,
-                "is_long": trade.side == "Long",
-                "trades": [],
-                "total_size_usd": 0.0,
-                "weighted_entry_sum": 0.0,
-                "weighted_entry_size": 0.0,
-                "realized_pnl": 0.0,
-                "total_fees_usd": 0.0,
-                "initial_margin_usd": 0.0,
-                "first_trade_timestamp": trade.timestamp,
-                "last_trade_timestamp": trade.timestamp,
-            }
-
-        pos = positions[key]
-        pos["trades"].append({
-            "tx_hash": trade.tx_hash,
-            "action": trade.action,
-            "size_delta_usd": trade.size_delta_usd,
-            "collateral_usd": trade.collateral_usd,
-            "execution_price": trade.execution_price,
-            "pnl_usd": trade.pnl_usd,
-            "timestamp": trade.timestamp,
-        })
-
-        # Track timestamps
-        if trade.timestamp < pos["first_trade_timestamp"]:
-            pos["first_trade_timestamp"] = trade.timestamp
-        if trade.timestamp > pos["last_trade_timestamp"]:
-            pos["last_trade_timestamp"] = trade.timestamp
-
-        # Track size and entry price
-        if trade.action in ("Open", "Increase"):
-            pos["total_size_usd"] += trade.size_delta_usd
-            pos["weighted_entry_sum"] += trade.execution_price * trade.size_delta_usd
-            pos["weighted_entry_size"] += trade.size_delta_usd
-            # First Open trade sets initial margin
-            if trade.action == "Open" and pos["initial_margin_usd"] == 0:
-                pos["initial_margin_usd"] = trade.collateral_usd
-        elif trade.action in ("Decrease", "Close"):
-            pos["total_size_usd"] -= trade.size_delta_usd
-            pos["realized_pnl"] += trade.pnl_usd
+    # Group trades per position first, then reduce each group with builtin
+    # sum over attrgetter maps (C loops) instead of per-trade dict updates.
+    # Sorting once by time (Timsort is ~linear on near-sorted input) keeps each
+    # group chronological, so first/last trade come from position, not scans.
+    grouped: dict[str, list[StrategyGMXTradeItem]] = {}
+    for trade in sorted(trades, key=_TRADE_TIMESTAMP):
+        group = grouped.get(trade.position_key)
+        if group is None:
+            group = grouped[trade.position_key] = []
+        group.append(trade)
 
     # Calculate weighted average entry price and format for Ledger
     result = []
-    for pos in positions.values():
+    for key, group in grouped.items():
+        pos = _AggPos(key, group)
+
         entry_price = 0.0
-        if pos["weighted_entry_size"] > 0:
-            entry_price = pos["weighted_entry_sum"] / pos["weighted_entry_size"]
+        if pos.weighted_entry_size > 0:
+            entry_price = pos.weighted_entry_sum / pos.weighted_entry_size
 
         # Determine status based on remaining size
-        status = "ACTIVE" if pos["total_size_usd"] > 0.01 else "CLOSED"
+        status = "ACTIVE" if pos.total_size_usd > 0.01 else "CLOSED"
 
         # Format as PerpetualPosition for LedgerMatrix
         result.append({
             "type": "perpetual",
             "protocol": "GMX V2",
-            "position_name": f"{pos['market']}/USD",
-            "position_key": pos["position_key"],
+            "position_name": f"{pos.market}/USD",
+            "position_key": pos.position_key,
             "chain": "arb",
-            "side": pos["side"],
+            "side": pos.side,
             "base_token": {
-                "symbol": pos["market"],
-                "address": pos["market_address"],
+                "symbol": pos.market,
+                "address": pos.market_address,
                 "price": 0.0,  # Would need live price feed
             },
             "margin_token": {
                 "symbol": "USDC",
                 "address": "",
-                "amount": pos["initial_margin_usd"],
+                "amount": pos.initial_margin_usd,
                 "price": 1.0,
-                "value_usd": pos["initial_margin_usd"],
+                "value_usd": pos.initial_margin_usd,
             },
-            "position_size": pos["total_size_usd"] / entry_price if entry_price > 0 else 0,
-            "position_value_usd": pos["total_size_usd"],
+            "position_size": pos.total_size_usd / entry_price if entry_price > 0 else 0,
+            "position_value_usd": pos.total_size_usd,
             "entry_price": entry_price,
             "mark_price": 0.0,  # Would need live price feed
             "liquidation_price": 0.0,
-            "leverage": pos["total_size_usd"] / pos["initial_margin_usd"] if pos["initial_margin_usd"] > 0 else 0,
+            "leverage": pos.total_size_usd / pos.initial_margin_usd if pos.initial_margin_usd > 0 else 0,
             # pnl_usd = UNREALIZED P&L (from live position data)
             # For strategy trades, we don't have live data, so this is 0
             # Realized P&L is tracked separately in realized_pnl_usd and perpHistory
             "pnl_usd": 0.0,
-            "total_value_usd": pos["total_size_usd"],
+            "total_value_usd": pos.total_size_usd,
             "debt_usd": 0.0,
-            "net_value_usd": pos["total_size_usd"],
-            "position_index": pos["position_key"],
+            "net_value_usd": pos.total_size_usd,
+            "position_index": pos.position_key,
             "status": status,
             # Enriched fields for Performance Analysis
-            "initial_margin_usd": pos["initial_margin_usd"],
+            "initial_margin_usd": pos.initial_margin_usd,
             "funding_rewards_usd": 0.0,  # Would need additional query
-            "realized_pnl_usd": pos["realized_pnl"],
-            "total_fees_usd": pos["total_fees_usd"],
-            "trade_count": len(pos["trades"]),
-            "trades": pos["trades"],
+            "realized_pnl_usd": pos.realized_pnl,
+            "total_fees_usd": pos.total_fees_usd,
+            "trade_count": len(pos.trades),
+            "trades": pos.trades,
         })
 
     return result
 
 
+# Discovery lookback for claimed-fee history
+_THREE_YEARS_S = 365 * 3 * 86400
+
+
+async def _fetch_live_gmx_positions(wallet: str) -> list[dict[str, Any]]:
+    """Live GMX positions, or [] straight away if the subgraph fails its health probe."""
+    gmx_subgraph = await get_gmx_subgraph_service()
+    if not await gmx_subgraph.meta_is_fresh():
+        logger.warning("GMX subgraph is unhealthy - skipping live perp positions")
+        return []
+    return await gmx_subgraph.get_full_positions(wallet)
+
+
 @router.post("/strategy/load")
 async def load_strategy_for_ledger(
-    request: StrategyLoadRequest
-) -> dict[str, Any]:
+    raw_request: Request
+) -> ORJSONResponse:
     """
     Load and enrich a strategy for Ledger analysis.
 
@@ -707,8 +987,21 @@ async def load_strategy_for_ledger(
     4. Aggregates GMX trades and returns perpHistory for realized P&L
 
     Returns the same data structure as wallet/ledger endpoint.
+
+    The body is a StrategyLoadRequest, validated straight from the raw JSON
+    bytes rather than through FastAPI's per-field body parsing.
     """
-    fetch_timestamp = datetime.utcnow().isoformat()
+    try:
+        request = _STRATEGY_LOAD_ADAPTER.validate_json(await raw_request.body())
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors()]
+        )
+
+    fetch_ns = time.time_ns()
+    # Background upstream fetches; anything still running when the handler
+    # exits (normally or by exception) is cancelled and reaped in finally
+    tasks: list[asyncio.Task] = []
     logger.info(f"Strategy load request received: wallet={request.wallet}, lp_items={len(request.lp_items)}, gmx_items={len(request.gmx_items)}, force_refresh={request.force_refresh}")
     try:
         wallet = request.wallet.lower()
@@ -718,15 +1011,80 @@ async def load_strategy_for_ledger(
         logger.info(f"Loading strategy with {len(lp_items)} LP items and {len(gmx_items)} GMX items")
 
         # ================================================================
-        # 0. Get DeBank positions for unclaimed LP fees (force refresh)
+        # 0. Start the independent upstream fetches concurrently
+        # ================================================================
+        # DeBank positions, DeBank tx discovery and GMX subgraph positions
+        # don't depend on each other, so kick them all off up front. The GMX
+        # task is only awaited where perp matching needs it, letting it
+        # overlap with LP enrichment.
+        debank = await get_debank_service()
+        # Always force refresh to get real-time unclaimed fees
+        debank_task = asyncio.create_task(
+            debank.get_wallet_positions(wallet, force_refresh=request.force_refresh)
+        )
+        tasks.append(debank_task)
+
+        discovery_task = None
+        if lp_items:
+            # Shares DeBankService's HTTP client, so no extra connection pool
+            discovery = await get_discovery_service()
+            # Fetch DeBank transaction history for claimed fees
+            since = datetime.fromtimestamp(time.time() - _THREE_YEARS_S)
+            discovery_task = asyncio.create_task(
+                discovery.discover_transactions(
+                    wallet_address=wallet,
+                    since=since,
+                    max_pages=100
+                )
+            )
+            tasks.append(discovery_task)
+
+        gmx_subgraph_task = None
+        if gmx_items:
+            gmx_subgraph_task = asyncio.create_task(_fetch_live_gmx_positions(wallet))
+            tasks.append(gmx_subgraph_task)
+
+        # ================================================================
+        # 0a. Aggregate GMX Trades into Positions (pure CPU, done while the
+        #     upstream fetches are in flight)
+        # ================================================================
+        aggregated_perp_positions = aggregate_gmx_trades_to_positions(gmx_items)
+
+        upstream_tasks = [debank_task]
+        if discovery_task:
+            upstream_tasks.append(discovery_task)
+        upstream_results = await asyncio.gather(*upstream_tasks, return_exceptions=True)
+
+        debank_result = upstream_results[0]
+        discovery_result = upstream_results[1] if discovery_task else None
+
+        if isinstance(discovery_result, Exception):
+            raise discovery_result
+
+        # Speculatively start the CoinGecko fallback for every ACTIVE perp
+        # symbol so its latency hides under LP enrichment and the GMX fetch.
+        # Started only once discovery succeeded, so failed requests don't
+        # spend rate-limited calls; cancelled below if live data ends up
+        # covering every position
+        candidate_symbols = list(dict.fromkeys(
+            symbol for p in aggregated_perp_positions
+            if p["status"] == "ACTIVE" and (symbol := p["base_token"]["symbol"])
+        ))
+        coingecko_task = None
+        if candidate_symbols:
+            coingecko = await get_coingecko_service()
+            coingecko_task = asyncio.create_task(coingecko.get_current_prices(candidate_symbols))
+            tasks.append(coingecko_task)
+
+        # ================================================================
+        # 0b. DeBank positions for unclaimed LP fees
         # ================================================================
         debank_lp_positions_by_id = {}
         debank_perp_positions = []  # For fallback only - prefer GMX subgraph
 
         try:
-            debank = await get_debank_service()
-            # Always force refresh to get real-time unclaimed fees
-            debank_result = await debank.get_wallet_positions(wallet, force_refresh=request.force_refresh)
+            if isinstance(debank_result, Exception):
+                raise debank_result
             debank_positions = debank_result.get("positions", [])
 
             # Separate LP and perp positions
@@ -753,206 +1111,152 @@ async def load_strategy_for_ledger(
         enriched_lp_positions = []
 
         if lp_items:
-            discovery = TransactionDiscoveryService()
-            graph = TheGraphService(settings.thegraph_api_key)
-
-            try:
-                # Fetch DeBank transaction history for claimed fees
-                since = datetime.now() - timedelta(days=365 * 3)
-                debank_result = await discovery.discover_transactions(
-                    wallet_address=wallet,
-                    since=since,
-                    max_pages=100
-                )
+            graph = await get_thegraph_service()
 
-                # Build dict of tx_hash -> tx data for Uniswap transactions
-                debank_txs = {}
-                for tx in debank_result.get("transactions", []):
-                    if "uniswap" in (tx.get("project_id") or "").lower():
-                        tx_hash = tx.get("id", "").lower()
-                        if tx_hash:
-                            debank_txs[tx_hash] = tx
-
-                logger.info(f"Loaded {len(debank_txs)} Uniswap transactions from DeBank")
-
-                async def enrich_lp_position(item: StrategyLPItem) -> Optional[dict]:
-                    try:
-                        # STEP 1: Get full position data from subgraph
-                        full_position = await graph.get_position_with_historical_values(
-                            item.position_id,
-                            coingecko_service=None,
-                            owner_address=wallet
-                        )
-
-                        if not full_position:
-                            logger.warning(f"Could not get position data for {item.position_id}")
-                            return None
-
-                        # STEP 2: Get transaction history for claimed fees breakdown
-                        history = await graph.get_position_history(item.position_id, debank_txs)
-
-                        # Calculate claimed fees from Collect transactions
-                        claimed_fees = {"token0": 0, "token1": 0, "total": 0}
-                        transactions = []
-
-                        if history:
-                            transactions = history.get("transactions", [])
-                            for tx in transactions:
-                                if tx["action"] == "Collect":
-                                    claimed_fees["token0"] += tx["token0_value_usd"]
-                                    claimed_fees["token1"] += tx["token1_value_usd"]
-                                    claimed_fees["total"] += tx["total_value_usd"]
-
-                        # Fallback to collected_fees from position
-                        if claimed_fees["total"] == 0:
-                            collected = full_position.get("collected_fees", {})
-                            claimed_fees = {
-                                "token0": collected.get("token0", 0) * full_position.get("token0", {}).get("price", 0),
-                                "token1": collected.get("token1", 0) * full_position.get("token1", {}).get("price", 0),
-                                "total": collected.get("total_usd", 0)
-                            }
-
-                        # STEP 3: Get unclaimed fees from DeBank
-                        unclaimed_fees_usd = 0
-                        debank_pos = debank_lp_positions_by_id.get(str(item.position_id))
-                        if debank_pos:
-                            unclaimed_fees_usd = debank_pos.get("unclaimed_fees_usd", 0)
-                            logger.info(f"Position {item.position_id}: Found unclaimed fees ${unclaimed_fees_usd:.2f} from DeBank")
-
-                        # Build LPPosition format matching wallet/ledger endpoint
-                        return {
-                            "pool_name": full_position.get("pool_name", f"{item.token0_symbol}/{item.token1_symbol}"),
-                            "pool_address": full_position.get("pool_address", item.pool_address),
-                            "position_index": item.position_id,
-                            "chain": full_position.get("chain", "eth"),
-                            "fee_tier": full_position.get("fee_tier", 0.0005),
-                            "in_range": full_position.get("in_range", True),
-                            "token0": full_position.get("token0", {
-                                "symbol": item.token0_symbol,
-                                "address": "",
-                                "amount": 0,
-                                "price": 0,
-                                "value_usd": 0,
-                            }),
-                            "token1": full_position.get("token1", {
-                                "symbol": item.token1_symbol,
-                                "address": "",
-                                "amount": 0,
-                                "price": 0,
-                                "value_usd": 0,
-                            }),
-                            "total_value_usd": full_position.get("total_value_usd", 0),
-                            "unclaimed_fees_usd": unclaimed_fees_usd,
-                            "initial_deposits": full_position.get("initial_deposits", {
-                                "token0": {"amount": 0, "value_usd": 0},
-                                "token1": {"amount": 0, "value_usd": 0}
-                            }),
-                            "initial_total_value_usd": full_position.get("initial_total_value_usd", 0),
-                            "claimed_fees": claimed_fees,
-                            "position_mint_timestamp": full_position.get("position_mint_timestamp", 0),
-                            "gas_fees_usd": full_position.get("gas_fees_usd", 0),
-                            "transaction_count": full_position.get("transaction_count", len(transactions)),
-                            "status": item.status,
-                            "transactions": transactions,
-                            # Tick range for price bounds visualization
-                            "tick_lower": full_position.get("tick_lower"),
-                            "tick_upper": full_position.get("tick_upper"),
-                            "current_tick": full_position.get("current_tick"),
-                            "data_sources": {
-                                "position": "uniswap_subgraph",
-                                "unclaimed_fees": "debank" if unclaimed_fees_usd > 0 else "none",
-                                "transactions": history.get("data_sources", {}) if history else {},
-                            },
-                        }
-                    except Exception as e:
-                        logger.error(f"Error enriching LP position {item.position_id}: {e}", exc_info=True)
-                        return None
+            debank_txs = _index_uniswap_txs(discovery_result.get("transactions", []))
 
-                # Parallel fetch all LP positions
-                lp_tasks = [enrich_lp_position(item) for item in lp_items]
-                lp_results = await asyncio.gather(*lp_tasks)
-                enriched_lp_positions = [r for r in lp_results if r is not None]
+            logger.info(f"Loaded {len(debank_txs)} Uniswap transactions from DeBank")
 
-            finally:
-                await discovery.close()
-                await graph.close()
+            # STEP 1 + 2: Full position data and transaction history for every
+            # item from batched subgraph queries (skipped if the indexer is
+            # unhealthy, rather than waiting out its timeouts)
+            position_bundle = {}
+            if await graph.meta_is_fresh():
+                position_bundle = await graph.get_positions_bundle(
+                    [item.position_id for item in lp_items],
+                    debank_txs,
+                    owner_address=wallet
+                )
+            else:
+                logger.warning("Uniswap subgraph is lagging or unhealthy - skipping LP enrichment")
+
+            def enrich_lp_position(item: StrategyLPItem) -> Optional[dict]:
+                try:
+                    full_position, history = position_bundle.get(item.position_id, (None, None))
+
+                    if not full_position:
+                        # Subgraph failed even after retries: still return the
+                        # item (strategy fields, zero values) so the UI renders it
+                        logger.warning(f"Could not get position data for {item.position_id} - returning degraded entry")
+                        full_position = _EMPTY
+
+                    # Calculate claimed fees from Collect transactions
+                    claimed_fees = {"token0": 0, "token1": 0, "total": 0}
+                    transactions = []
+
+                    if history:
+                        transactions = history.get("transactions", [])
+                        for tx in transactions:
+                            if tx["action"] == "Collect":
+                                claimed_fees["token0"] += tx["token0_value_usd"]
+                                claimed_fees["token1"] += tx["token1_value_usd"]
+                                claimed_fees["total"] += tx["total_value_usd"]
+
+                    # Fallback to collected_fees from position
+                    if claimed_fees["total"] == 0:
+                        collected = full_position.get("collected_fees") or _EMPTY
+                        claimed_fees = {
+                            "token0": collected.get("token0", 0) * (full_position.get("token0") or _EMPTY).get("price", 0),
+                            "token1": collected.get("token1", 0) * (full_position.get("token1") or _EMPTY).get("price", 0),
+                            "total": collected.get("total_usd", 0)
+                        }
 
-        # ================================================================
-        # 2. Aggregate GMX Trades into Positions
-        # ================================================================
-        aggregated_perp_positions = aggregate_gmx_trades_to_positions(gmx_items)
+                    # STEP 3: Get unclaimed fees from DeBank
+                    unclaimed_fees_usd = 0
+                    debank_pos = debank_lp_positions_by_id.get(str(item.position_id))
+                    if debank_pos:
+                        unclaimed_fees_usd = debank_pos.get("unclaimed_fees_usd", 0)
+                        logger.info(f"Position {item.position_id}: Found unclaimed fees ${unclaimed_fees_usd:.2f} from DeBank")
+
+                    # Build LPPosition format matching wallet/ledger endpoint
+                    return {
+                        "pool_name": full_position.get("pool_name", f"{item.token0_symbol}/{item.token1_symbol}"),
+                        "pool_address": full_position.get("pool_address", item.pool_address),
+                        "position_index": item.position_id,
+                        "chain": full_position.get("chain", "eth"),
+                        "fee_tier": full_position.get("fee_tier", 0.0005),
+                        "in_range": full_position.get("in_range", True),
+                        "token0": full_position.get("token0", {
+                            "symbol": item.token0_symbol,
+                            "address": "",
+                            "amount": 0,
+                            "price": 0,
+                            "value_usd": 0,
+                        }),
+                        "token1": full_position.get("token1", {
+                            "symbol": item.token1_symbol,
+                            "address": "",
+                            "amount": 0,
+                            "price": 0,
+                            "value_usd": 0,
+                        }),
+                        "total_value_usd": full_position.get("total_value_usd", 0),
+                        "unclaimed_fees_usd": unclaimed_fees_usd,
+                        "initial_deposits": full_position.get("initial_deposits", {
+                            "token0": {"amount": 0, "value_usd": 0},
+                            "token1": {"amount": 0, "value_usd": 0}
+                        }),
+                        "initial_total_value_usd": full_position.get("initial_total_value_usd", 0),
+                        "claimed_fees": claimed_fees,
+                        "position_mint_timestamp": full_position.get("position_mint_timestamp", 0),
+                        "gas_fees_usd": full_position.get("gas_fees_usd", 0),
+                        "transaction_count": full_position.get("transaction_count", len(transactions)),
+                        "status": item.status,
+                        "transactions": transactions,
+                        # Tick range for price bounds visualization
+                        "tick_lower": full_position.get("tick_lower"),
+                        "tick_upper": full_position.get("tick_upper"),
+                        "current_tick": full_position.get("current_tick"),
+                        "data_sources": {
+                            "position": "uniswap_subgraph" if full_position else "unavailable",
+                            "unclaimed_fees": "debank" if unclaimed_fees_usd > 0 else "none",
+                            "transactions": history.get("data_sources", {}) if history else {},
+                        },
+                    }
+                except Exception as e:
+                    logger.error(f"Error enriching LP position {item.position_id}: {e}", exc_info=True)
+                    return None
+
+            lp_results = [enrich_lp_position(item) for item in lp_items]
+            enriched_lp_positions = [r for r in lp_results if r is not None]
 
         # ================================================================
-        # 2b. Enrich ACTIVE positions with LIVE data from GMX Subgraph
+        # 2. Enrich ACTIVE positions with LIVE data from GMX Subgraph
         # ================================================================
         # PRIMARY: GMX Subgraph (real-time mark_price from tokenPrice entity)
         # FALLBACK: DeBank (for entry_price if subgraph doesn't have it)
         # FINAL FALLBACK: CoinGecko (if neither has mark_price)
 
-        def normalize_market(symbol: str) -> str:
-            """Normalize market symbols for matching (ETH/WETH, BTC/WBTC)"""
-            upper = symbol.upper()
-            if upper in ("WETH", "ETH"):
-                return "ETH"
-            if upper in ("WBTC", "BTC"):
-                return "BTC"
-            return upper
-
-        # Fetch LIVE perp positions from GMX subgraph (like wallet/ledger does)
+        # LIVE perp positions from GMX subgraph (like wallet/ledger does),
+        # started at handler entry
         gmx_subgraph_positions = []
-        try:
-            gmx_subgraph = GMXSubgraphService()
-            gmx_subgraph_positions = await gmx_subgraph.get_full_positions(wallet)
-            await gmx_subgraph.close()
-            logger.info(f"Fetched {len(gmx_subgraph_positions)} live positions from GMX subgraph")
-        except Exception as e:
-            logger.warning(f"Could not fetch GMX subgraph positions: {e}")
-
-        def find_matching_subgraph_perp(
-            subgraph_positions: list[dict],
-            market: str,
-            side: str
-        ) -> Optional[dict]:
-            """Find a GMX subgraph position matching the strategy position"""
-            normalized_market = normalize_market(market)
-
-            for pos in subgraph_positions:
-                # GMX subgraph positions have base_token.symbol and side
-                base_symbol = pos.get("base_token", {}).get("symbol", "")
-                pos_side = pos.get("side", "")
-
-                if normalize_market(base_symbol) == normalized_market and pos_side == side:
-                    return pos
-
-            return None
-
-        def find_matching_debank_perp(
-            debank_positions: list[dict],
-            market: str,
-            side: str
-        ) -> Optional[dict]:
-            """Find a DeBank perp position matching the strategy position"""
-            normalized_market = normalize_market(market)
-
-            for pos in debank_positions:
-                base_symbol = pos.get("base_token", {}).get("symbol", "")
-                pos_side = pos.get("side", "")
+        if gmx_subgraph_task:
+            try:
+                gmx_subgraph_positions = await gmx_subgraph_task
+                logger.info(f"Fetched {len(gmx_subgraph_positions)} live positions from GMX subgraph")
+            except Exception as e:
+                logger.warning(f"Could not fetch GMX subgraph positions: {e}")
 
-                if normalize_market(base_symbol) == normalized_market and pos_side == side:
-                    return pos
+        # (normalized market, side) -> first matching live position
+        subgraph_perp_index = _index_perps_by_market_side(gmx_subgraph_positions)
+        debank_perp_index = _index_perps_by_market_side(debank_perp_positions)
 
-            return None
+        # Active positions still without a mark_price after enrichment, for
+        # the CoinGecko fallback below
+        positions_needing_price = []
 
         # Enrich active positions with live data
         for perp in aggregated_perp_positions:
             if perp.get("status") != "ACTIVE":
                 continue
 
-            market = perp.get("base_token", {}).get("symbol", "")
+            market = (perp.get("base_token") or _EMPTY).get("symbol", "")
             side = perp.get("side", "")
 
+            perp_key = (normalize_market(market), side)
+
             # PRIMARY: Try GMX subgraph first (real-time, no cache)
-            subgraph_pos = find_matching_subgraph_perp(gmx_subgraph_positions, market, side)
+            subgraph_pos = subgraph_perp_index.get(perp_key)
 
             if subgraph_pos:
                 # Use GMX subgraph's mark_price (from tokenPrice entity, always fresh)
@@ -973,7 +1277,7 @@ async def load_strategy_for_ledger(
                 logger.info(f"GMX Subgraph: {side} {market} entry=${subgraph_entry_price:.2f}, mark=${subgraph_mark_price:.2f}, pnl=${subgraph_pnl:.2f}")
             else:
                 # FALLBACK: Try DeBank (may be cached)
-                debank_pos = find_matching_debank_perp(debank_perp_positions, market, side)
+                debank_pos = debank_perp_index.get(perp_key)
 
                 if debank_pos:
                     debank_entry_price = debank_pos.get("entry_price", 0)
@@ -994,49 +1298,49 @@ async def load_strategy_for_ledger(
                     perp["_data_source"] = "aggregated_trades"
                     logger.warning(f"No live data found for {side} {market} - using aggregated trade values")
 
-        # FINAL FALLBACK: CoinGecko for any positions still missing mark_price
-        positions_needing_price = [
-            p for p in aggregated_perp_positions
-            if p.get("status") == "ACTIVE" and p.get("mark_price", 0) == 0
-        ]
+            if perp.get("mark_price", 0) == 0:
+                positions_needing_price.append(perp)
 
-        if positions_needing_price:
+        # FINAL FALLBACK: CoinGecko for any positions still missing mark_price
+        if coingecko_task and not positions_needing_price:
+            coingecko_task.cancel()
+        elif coingecko_task:
             try:
-                coingecko = CoinGeckoService()
-                symbols = list(set(
-                    p.get("base_token", {}).get("symbol", "")
-                    for p in positions_needing_price
-                    if p.get("base_token", {}).get("symbol")
-                ))
-
-                if symbols:
-                    live_prices = await coingecko.get_current_prices(symbols)
-                    logger.info(f"CoinGecko fallback prices: {live_prices}")
-
-                    for perp in positions_needing_price:
-                        market = perp.get("base_token", {}).get("symbol", "")
-                        normalized = normalize_market(market)
-                        live_price = live_prices.get(normalized) or live_prices.get(market.upper())
-
-                        if live_price and live_price > 0:
-                            perp["mark_price"] = live_price
-                            if "base_token" in perp:
-                                perp["base_token"]["price"] = live_price
-                            perp["_data_source"] = "coingecko"
-                            logger.info(f"CoinGecko fallback: {perp.get('side')} {market} mark_price=${live_price:.2f}")
-
-                await coingecko.close()
+                live_prices = await coingecko_task
+                logger.info(f"CoinGecko fallback prices: {live_prices}")
+
+                for perp in positions_needing_price:
+                    market = (perp.get("base_token") or _EMPTY).get("symbol", "")
+                    normalized = normalize_market(market)
+                    live_price = live_prices.get(normalized) or live_prices.get(market.upper())
+
+                    if live_price and live_price > 0:
+                        perp["mark_price"] = live_price
+                        if "base_token" in perp:
+                            perp["base_token"]["price"] = live_price
+                        perp["_data_source"] = "coingecko"
+                        logger.info(f"CoinGecko fallback: {perp.get('side')} {market} mark_price=${live_price:.2f}")
             except Exception as e:
                 logger.warning(f"CoinGecko fallback failed: {e}")
 
-        # Calculate total realized P&L from all perp positions
-        total_realized_pnl = sum(p.get("realized_pnl_usd", 0) for p in aggregated_perp_positions)
-        total_margin = sum(p.get("initial_margin_usd", 0) for p in aggregated_perp_positions)
+        # Totals in one pass per list. The aggregator always sets the perp
+        # fields; LP fields may be missing on subgraph fallbacks.
+        total_realized_pnl = total_margin = 0.0
+        for p in aggregated_perp_positions:
+            total_realized_pnl += p["realized_pnl_usd"]
+            total_margin += p["initial_margin_usd"]
+
+        total_gas_fees = total_lp_initial_value = 0.0
+        for p in enriched_lp_positions:
+            total_gas_fees += p.get("gas_fees_usd", 0) or 0
+            total_lp_initial_value += p.get("initial_total_value_usd", 0) or 0
 
         # ================================================================
         # 3. Return Ledger-Ready Data (matching wallet/ledger format)
         # ================================================================
-        return {
+        # Returned as a Response so FastAPI skips jsonable_encoder on the
+        # (potentially large) payload and orjson serializes it directly
+        return ORJSONResponse({
             "status": "success",
             "data": {
                 "wallet": wallet,
@@ -1048,14 +1352,12 @@ async def load_strategy_for_ledger(
                     "current_margin": total_margin,
                     "total_funding_claimed": 0  # Would need additional query
                 },
-                "total_gas_fees_usd": sum(p.get("gas_fees_usd", 0) for p in enriched_lp_positions),
-                "fetched_at": fetch_timestamp,  # When this data was fetched
+                "total_gas_fees_usd": total_gas_fees,
+                "fetched_at": datetime.fromtimestamp(fetch_ns // 1_000_000_000, tz=timezone.utc).isoformat(),  # When this data was fetched
                 "summary": {
                     "lp_count": len(enriched_lp_positions),
                     "perp_count": len(aggregated_perp_positions),
-                    "total_lp_initial_value": sum(
-                        p.get("initial_total_value_usd", 0) for p in enriched_lp_positions
-                    ),
+                    "total_lp_initial_value": total_lp_initial_value,
                     "total_perp_realized_pnl": total_realized_pnl,
                 },
                 "data_sources": {
@@ -1067,14 +1369,20 @@ async def load_strategy_for_ledger(
                     "fallback_price": "coingecko",
                 }
             }
-        }
+        })
 
     except Exception as e:
         logger.error(f"Error loading strategy: {e}", exc_info=True)
-        return {
+        return ORJSONResponse({
             "status": "error",
             "detail": {"error": str(e)}
-        }
+        })
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        # Also retrieves exceptions of tasks that finished but were never awaited
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 
 # ============================================================================
@@ -1082,6 +1390,75 @@ async def load_strategy_for_ledger(
 # ============================================================================
 
 
+def _ratio_statistics(ratios: list[float]) -> tuple[float, float, float, float]:
+    """
+    Mean, sample std, min and max of a ratio series in a single pass.
+
+    Welford's online update keeps the variance numerically stable without a
+    second pass over the series (statistics.stdev does exact Fraction math,
+    which is far slower on thousands of points).
+    """
+    n = 0
+    mean = m2 = 0.0
+    lo = hi = ratios[0] if ratios else 0
+    for r in ratios:
+        n += 1
+        delta = r - mean
+        mean += delta / n
+        m2 += delta * (r - mean)
+        if r < lo:
+            lo = r
+        elif r > hi:
+            hi = r
+    if not n:
+        return 0, 0, 0, 0
+    std = math.sqrt(m2 / (n - 1)) if n > 1 else 0
+    return mean, std, lo, hi
+
+
+def _find_threshold_breaches(
+    ratio_data: list[dict],
+    ratios: list[float],
+    initial_ratio: float,
+    upper_bound: float,
+    lower_bound: float,
+    to_ts: int
+) -> list[dict[str, Any]]:
+    """
+    Intervals where the ratio sits outside [lower_bound, upper_bound].
+
+    groupby splits the series into runs of in-band / out-of-band points in a
+    single pass; each out-of-band run is one breach, ending at the next
+    in-band point. A run that reaches the last point is reported as ongoing.
+    """
+    def out_of_band(point: tuple[int, float]) -> bool:
+        return point[1] > upper_bound or point[1] < lower_bound
+
+    n = len(ratios)
+    breaches = []
+    for out, run in groupby(enumerate(ratios), key=out_of_band):
+        if not out:
+            continue
+        start, first = next(run)
+        end, peak = start, abs(first - initial_ratio)
+        for end, r in run:
+            if abs(r - initial_ratio) > peak:
+                peak = abs(r - initial_ratio)
+        end += 1
+        breach = {
+            "start_timestamp": ratio_data[start]["timestamp"],
+            "direction": "above" if first > upper_bound else "below",
+            "peak_deviation": peak / initial_ratio if initial_ratio else 0,
+        }
+        if end == n:
+            breach["end_timestamp"] = to_ts
+            breach["ongoing"] = True
+        else:
+            breach["end_timestamp"] = ratio_data[end]["timestamp"]
+        breaches.append(breach)
+    return breaches
+
+
 class PriceRatioRequest(BaseModel):
     """Request for price ratio time series."""
     symbol1: str  # e.g., "LINK"
@@ -1090,6 +1467,61 @@ class PriceRatioRequest(BaseModel):
     to_timestamp: Optional[int] = None  # Default to now
     interval_hours: int = 4  # 4H chart by default
     threshold: Optional[float] = None  # Optional threshold for breach markers
+    include_deviation: bool = False  # Force per-point deviation_pct on large series
+
+
+# Series at least this long omit per-point deviation_pct unless include_deviation is set
+DEVIATION_POINT_LIMIT = 500
+
+# Price ratio series per (symbol1, symbol2, from_ts, to_ts bucket, interval_hours).
+# Entries are shared between requests and must not be mutated.
+_price_ratio_cache = TTLCache(ttl_seconds=300, max_entries=1024)
+
+
+async def _get_price_ratio_series(
+    symbol1: str,
+    symbol2: str,
+    from_ts: int,
+    to_ts: int,
+    interval_hours: int
+) -> Optional[tuple[list[dict], list[float], tuple[float, float, float, float]]]:
+    """
+    CoinGecko ratio series plus its ratios and (mean, std, min, max), cached.
+
+    Both ends of the window are bucketed to the chart interval, so requests
+    made within the same candle share an entry (clients send sliding windows
+    such as now - 365d). The start is rounded up, never down: the series is
+    fetched from it, and it must stay within CoinGecko's 365-day public
+    history and not precede the requested start.
+    """
+    interval_s = interval_hours * 3600
+    if interval_s > 0:
+        from_ts = -(-from_ts // interval_s) * interval_s
+        bucket = to_ts // interval_s * interval_s
+    else:
+        bucket = to_ts
+    cache_key = (symbol1, symbol2, from_ts, bucket, interval_hours)
+    cached = _price_ratio_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Shared service, so concurrent loads of the same pair share in-flight fetches
+    coingecko = await get_coingecko_service()
+    ratio_data = await coingecko.get_price_ratio_time_series(
+        symbol1=symbol1,
+        symbol2=symbol2,
+        from_timestamp=from_ts,
+        to_timestamp=to_ts,
+        interval_hours=interval_hours
+    )
+
+    if not ratio_data:
+        return None
+
+    ratios = [d["ratio"] for d in ratio_data]
+    result = (ratio_data, ratios, _ratio_statistics(ratios))
+    _price_ratio_cache.set(cache_key, result)
+    return result
 
 
 @router.post("/price-ratio-history")
@@ -1113,80 +1545,52 @@ async def get_price_ratio_history(
         from_ts = request.from_timestamp
         to_ts = request.to_timestamp or int(datetime.utcnow().timestamp())
 
-        coingecko = CoinGeckoService()
-        ratio_data = await coingecko.get_price_ratio_time_series(
-            symbol1=request.symbol1,
-            symbol2=request.symbol2,
-            from_timestamp=from_ts,
-            to_timestamp=to_ts,
-            interval_hours=request.interval_hours
+        series = await _get_price_ratio_series(
+            request.symbol1, request.symbol2, from_ts, to_ts, request.interval_hours
         )
-        await coingecko.close()
 
-        if not ratio_data:
+        if series is None:
             return {
                 "status": "error",
                 "detail": {"error": f"Could not fetch price data for {request.symbol1}/{request.symbol2}"}
             }
 
-        # Calculate statistics
-        ratios = [d["ratio"] for d in ratio_data]
+        # Statistics come with the (cached) series
+        ratio_data, ratios, (mean_ratio, std_ratio, min_ratio, max_ratio) = series
         initial_ratio = ratios[0] if ratios else 0
         current_ratio = ratios[-1] if ratios else 0
 
-        import statistics
-        mean_ratio = statistics.mean(ratios) if ratios else 0
-        std_ratio = statistics.stdev(ratios) if len(ratios) > 1 else 0
-        min_ratio = min(ratios) if ratios else 0
-        max_ratio = max(ratios) if ratios else 0
-
         # Calculate threshold breaches if threshold provided
+        # Threshold is a percentage deviation from initial ratio
+        # e.g., threshold=0.05 means trigger when ratio deviates 5% from initial
+        threshold = request.threshold
+        upper_bound = lower_bound = None
+        if threshold:
+            upper_bound = initial_ratio * (1 + threshold)
+            lower_bound = initial_ratio * (1 - threshold)
+
         breaches = []
-        if request.threshold and request.threshold > 0:
-            # Threshold is a percentage deviation from initial ratio
-            # e.g., threshold=0.05 means trigger when ratio deviates 5% from initial
-            upper_bound = initial_ratio * (1 + request.threshold)
-            lower_bound = initial_ratio * (1 - request.threshold)
-
-            in_breach = False
-            breach_start = None
-            breach_direction = None
-
-            for i, point in enumerate(ratio_data):
-                ratio = point["ratio"]
-                is_breach = ratio > upper_bound or ratio < lower_bound
-
-                if is_breach and not in_breach:
-                    # Start of breach
-                    in_breach = True
-                    breach_start = point["timestamp"]
-                    breach_direction = "above" if ratio > upper_bound else "below"
-                elif not is_breach and in_breach:
-                    # End of breach
-                    in_breach = False
-                    breaches.append({
-                        "start_timestamp": breach_start,
-                        "end_timestamp": point["timestamp"],
-                        "direction": breach_direction,
-                        "peak_deviation": 0,  # Would need to track
-                    })
-                    breach_start = None
-
-            # Handle ongoing breach
-            if in_breach and breach_start:
-                breaches.append({
-                    "start_timestamp": breach_start,
-                    "end_timestamp": to_ts,
-                    "direction": breach_direction,
-                    "ongoing": True,
-                })
+        if threshold and threshold > 0:
+            breaches = _find_threshold_breaches(
+                ratio_data, ratios, initial_ratio, upper_bound, lower_bound, to_ts
+            )
 
-        # Calculate deviation percentage at each point
-        for point in ratio_data:
-            if initial_ratio > 0:
-                point["deviation_pct"] = (point["ratio"] - initial_ratio) / initial_ratio * 100
-            else:
-                point["deviation_pct"] = 0
+        # Calculate deviation percentage at each point (small series only;
+        # large ones leave it to the client to keep the payload down).
+        # Points are copied so the cached series stays untouched.
+        note = None
+        if len(ratio_data) < DEVIATION_POINT_LIMIT or request.include_deviation:
+            scale = 100 / initial_ratio if initial_ratio > 0 else 0
+            ratio_data = [
+                {**point, "deviation_pct": (ratio - initial_ratio) * scale}
+                for point, ratio in zip(ratio_data, ratios)
+            ]
+        else:
+            note = (
+                f"deviation_pct omitted for series of {DEVIATION_POINT_LIMIT}+ points; "
+                "compute (ratio - initial_ratio) / initial_ratio * 100 client-side "
+                "or set include_deviation"
+            )
 
         return {
             "status": "success",
@@ -1206,13 +1610,14 @@ async def get_price_ratio_history(
                     "volatility_pct": (std_ratio / mean_ratio * 100) if mean_ratio > 0 else 0,
                 },
                 "threshold_analysis": {
-                    "threshold": request.threshold,
+                    "threshold": threshold,
                     "breaches": breaches,
                     "breach_count": len(breaches),
-                    "upper_bound": initial_ratio * (1 + request.threshold) if request.threshold else None,
-                    "lower_bound": initial_ratio * (1 - request.threshold) if request.threshold else None,
-                } if request.threshold else None,
+                    "upper_bound": upper_bound,
+                    "lower_bound": lower_bound,
+                } if threshold else None,
                 "data_source": "coingecko",
+                "note": note,
             }
         }
 
@@ -12,12 +12,23 @@ Key Logic:
 """
 
 from datetime import datetime
+from decimal import Decimal
+from operator import itemgetter
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Shared read-only fallback for missing sends/receives
+_EMPTY: tuple = ()
+
+_TIME_AT = itemgetter("time_at")
+
+# Remaining base-asset balance (token units) treated as a full withdrawal
+LIFECYCLE_DUST_BALANCE = Decimal("0.01")
+_ZERO = Decimal(0)
+
 # Known stablecoins and base assets (not vault tokens)
-KNOWN_BASE_ASSETS = {
+KNOWN_BASE_ASSETS = frozenset({
     # USDC variants
     "0xaf88d065e77c8cc2239327c5edb3a432268e5831",  # USDC Arbitrum
     "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48",  # USDC Ethereum
@@ -32,28 +43,65 @@ KNOWN_BASE_ASSETS = {
     "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2",  # WETH Ethereum
     # sUSDS
     "0xa3931d71877c0e7a3148cb7eb4463524fec27fbd",  # sUSDS
-}
+})
+
+# Common stablecoin / base asset symbols (uppercased)
+BASE_SYMBOLS = frozenset({
+    "USDC", "USDT", "DAI", "USDS", "SUSD", "FRAX", "LUSD", "WETH", "WBTC", "ETH",
+})
+
+
+def _base_info(token_id: str, token_dict: dict, base_cache: dict[str, tuple[bool, str]]) -> tuple[bool, str]:
+    """
+    (is_base_asset, display_symbol) for a token, memoized in base_cache so the
+    lower/upper/lookup work runs once per unique token.
+    """
+    info = base_cache.get(token_id)
+    if info is None:
+        token_info = token_dict.get(token_id) or {}
+        symbol = token_info.get("symbol") or token_info.get("optimized_symbol") or ""
+        info = base_cache[token_id] = (
+            token_id.lower() in KNOWN_BASE_ASSETS or symbol.upper() in BASE_SYMBOLS,
+            symbol or "?",
+        )
+    return info
+
+
+def _scan_base(
+    entries,
+    token_dict: dict,
+    base_cache: dict[str, tuple[bool, str]]
+) -> tuple[Decimal, str, str] | None:
+    """
+    First base asset transfer in entries as (amount, symbol, token_id), or None.
+
+    Amounts are Decimals parsed from their decimal string, so lifecycle
+    balances add up exactly instead of drifting like float sums.
+    """
+    cache_get = base_cache.get
+    for entry in entries:
+        token_id = entry.get("token_id", "")
+        info = cache_get(token_id) or _base_info(token_id, token_dict, base_cache)
+        if info[0]:
+            return (Decimal(str(entry.get("amount") or 0)), info[1], token_id)
+    return None
+
+
+def _has_base(entries, token_dict: dict, base_cache: dict[str, tuple[bool, str]]) -> bool:
+    """True if any transfer in entries moves a base asset."""
+    return any(_base_info(entry.get("token_id", ""), token_dict, base_cache)[0] for entry in entries)
 
 
 def is_base_asset(token_id: str, token_dict: dict) -> bool:
     """Check if a token is a known base asset (not a vault token)"""
-    token_id_lower = token_id.lower()
-    
-    # Check known list
-    if token_id_lower in KNOWN_BASE_ASSETS:
-        return True
-    
-    # Check token info for common stablecoin symbols
-    token_info = token_dict.get(token_id, {})
-    symbol = (token_info.get("symbol") or token_info.get("optimized_symbol") or "").upper()
-    
-    if symbol in ["USDC", "USDT", "DAI", "USDS", "SUSD", "FRAX", "LUSD", "WETH", "WBTC", "ETH"]:
-        return True
-    
-    return False
+    return _base_info(token_id, token_dict, {})[0]
 
 
-def classify_yield_transaction(tx: dict, token_dict: dict) -> tuple[str, float, str]:
+def classify_yield_transaction(
+    tx: dict,
+    token_dict: dict,
+    base_cache: dict[str, tuple[bool, str]] | None = None
+) -> tuple[str, Decimal, str]:
     """
     Classify a yield/lending transaction as DEPOSIT or WITHDRAW.
     
@@ -61,28 +109,14 @@ def classify_yield_transaction(tx: dict, token_dict: dict) -> tuple[str, float,
     - DEPOSIT: User sends base asset, receives vault token
     - WITHDRAW: User sends vault token, receives base asset
     """
-    sends = tx.get("sends", []) or []
-    receives = tx.get("receives", []) or []
+    if base_cache is None:
+        base_cache = {}
+    sends = tx.get("sends") or _EMPTY
+    receives = tx.get("receives") or _EMPTY
     
     # Find base assets in sends and receives
-    base_sent = None
-    base_received = None
-    
-    for s in sends:
-        token_id = s.get("token_id", "")
-        if is_base_asset(token_id, token_dict):
-            token_info = token_dict.get(token_id, {})
-            symbol = token_info.get("symbol") or token_info.get("optimized_symbol") or "?"
-            base_sent = (float(s.get("amount", 0)), symbol, token_id)
-            break
-    
-    for r in receives:
-        token_id = r.get("token_id", "")
-        if is_base_asset(token_id, token_dict):
-            token_info = token_dict.get(token_id, {})
-            symbol = token_info.get("symbol") or token_info.get("optimized_symbol") or "?"
-            base_received = (float(r.get("amount", 0)), symbol, token_id)
-            break
+    base_sent = _scan_base(sends, token_dict, base_cache)
+    base_received = _scan_base(receives, token_dict, base_cache)
     
     # Classify based on base asset movement
     if base_sent and not base_received:
@@ -98,35 +132,23 @@ def classify_yield_transaction(tx: dict, token_dict: dict) -> tuple[str, float,
         else:
             return ("withdraw", base_received[0] - base_sent[0], base_received[1])
     
-    return ("unknown", 0, "")
+    return ("unknown", _ZERO, "")
 
 
-def split_yield_position_into_lifecycles(
-    position: dict,
-    token_dict: dict
+def _track_lifecycles(
+    sorted_txs: list[dict],
+    token_dict: dict,
+    base_cache: dict[str, tuple[bool, str]]
 ) -> list[dict]:
-    """
-    Split a yield/lending position's transactions into separate lifecycles.
-    
-    A lifecycle is: DEPOSIT(s) → ... → final WITHDRAW (balance → 0)
-    
-    Returns list of position objects, each representing one lifecycle.
-    """
-    transactions = position.get("transactions", [])
-    if not transactions:
-        return [position]  # No transactions, return as-is
-    
-    # Sort transactions chronologically
-    sorted_txs = sorted(transactions, key=lambda x: x.get("time_at", 0))
-    
+    """Walk the running base-asset balance, closing a lifecycle at each full withdrawal."""
     # Track lifecycles
     lifecycles = []
     current_lifecycle_txs = []
-    running_balance = 0.0
+    running_balance = _ZERO
     current_asset = ""
     
     for tx in sorted_txs:
-        action, amount, asset = classify_yield_transaction(tx, token_dict)
+        action, amount, asset = classify_yield_transaction(tx, token_dict, base_cache)
         
         if not current_asset and asset:
             current_asset = asset
@@ -139,7 +161,7 @@ def split_yield_position_into_lifecycles(
             current_lifecycle_txs.append(tx)
             
             # Check if this closes the position (balance near zero)
-            if running_balance <= 0.01 and current_lifecycle_txs:
+            if running_balance <= LIFECYCLE_DUST_BALANCE and current_lifecycle_txs:
                 # This lifecycle is complete (closed)
                 lifecycles.append({
                     "transactions": current_lifecycle_txs.copy(),
@@ -149,7 +171,7 @@ def split_yield_position_into_lifecycles(
                     "closed_at": tx.get("time_at"),
                 })
                 current_lifecycle_txs = []
-                running_balance = 0.0
+                running_balance = _ZERO
         else:
             # Unknown transaction type, add to current lifecycle
             current_lifecycle_txs.append(tx)
@@ -164,6 +186,56 @@ def split_yield_position_into_lifecycles(
             "closed_at": None,
         })
     
+    return lifecycles
+
+
+def split_yield_position_into_lifecycles(
+    position: dict,
+    token_dict: dict,
+    base_cache: dict[str, tuple[bool, str]] | None = None
+) -> list[dict]:
+    """
+    Split a yield/lending position's transactions into separate lifecycles.
+    
+    A lifecycle is: DEPOSIT(s) → ... → final WITHDRAW (balance → 0)
+    
+    base_cache memoizes per-token base asset classification; pass the same
+    dict for every position of a request.
+    
+    Returns list of position objects, each representing one lifecycle.
+    """
+    if base_cache is None:
+        base_cache = {}
+    transactions = position.get("transactions", [])
+    if not transactions:
+        return [position]  # No transactions, return as-is
+    
+    # Sort transactions chronologically (C-level key; fall back if time_at is missing)
+    if len(transactions) < 2:
+        sorted_txs = transactions
+    else:
+        try:
+            sorted_txs = sorted(transactions, key=_TIME_AT)
+        except KeyError:
+            sorted_txs = sorted(transactions, key=lambda x: x.get("time_at", 0))
+    
+    # Without any base asset received there is no withdrawal, so nothing can
+    # close: everything is one open lifecycle and the balance walk is skipped
+    if not any(_has_base(tx.get("receives") or _EMPTY, token_dict, base_cache) for tx in sorted_txs):
+        first_sent = next(
+            (sent for tx in sorted_txs if (sent := _scan_base(tx.get("sends") or _EMPTY, token_dict, base_cache))),
+            None
+        )
+        lifecycles = [{
+            "transactions": list(sorted_txs),
+            "status": "open",
+            "asset": first_sent[1] if first_sent else "",
+            "opened_at": sorted_txs[0].get("time_at"),
+            "closed_at": None,
+        }]
+    else:
+        lifecycles = _track_lifecycles(sorted_txs, token_dict, base_cache)
+    
     # If no lifecycles detected, return original
     if not lifecycles:
         return [position]
@@ -218,6 +290,8 @@ def process_positions_with_lifecycle_detection(
     Yield/lending positions are analyzed and potentially split.
     """
     result = []
+    # token_id -> (is_base_asset, symbol), shared across all positions
+    base_cache: dict[str, tuple[bool, str]] = {}
     
     for position in positions:
         pos_type = position.get("type", "")
@@ -225,7 +299,7 @@ def process_positions_with_lifecycle_detection(
         # Only process yield/lending positions
         if pos_type in ["yield", "lending"]:
             # Check if this position has transactions that span multiple lifecycles
-            lifecycles = split_yield_position_into_lifecycles(position, token_dict)
+            lifecycles = split_yield_position_into_lifecycles(position, token_dict, base_cache)
             result.extend(lifecycles)
         else:
             # LP, perpetual, etc. - keep as-is
@@ -9,102 +9,199 @@ Infers flow direction (INCREASE/DECREASE/OVERHEAD) from net value.
 from typing import Any, Optional
 from datetime import datetime
 from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import itemgetter
 
+# Shared read-only fallback for missing sends/receives
+_EMPTY: tuple = ()
+_EMPTY_INFO: dict = {}
 
-# === Helper Functions (must be defined first) ===
+_ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 
-def _is_nft_token(token_id: str, amount: float) -> bool:
-    """Check if a token is an NFT (amount=1, hash-like ID without 0x prefix)."""
-    return amount == 1 and len(token_id) >= 20 and not token_id.startswith("0x")
+# Sort key for groups (most recent first via reverse=True)
+_LATEST_ACTIVITY = itemgetter("latestActivity")
 
+# Substrings of project_id / tx name used for position type classification
+_NFT_LP_PROTOCOLS = ("uniswap", "pancake", "sushi", "aero", "velo")
+_PERP_PROTOCOLS = ("gmx", "gains", "kwenta", "perp")
+_LP_PROTOCOLS = ("uniswap", "pancake", "sushi", "curve", "balancer", "aero", "velo")
+_YIELD_ACTIONS = ("deposit", "withdraw", "supply", "borrow", "repay")
+_YIELD_PROTOCOLS = ("aave", "compound", "euler", "silo", "morpho")
 
-def _extract_nft_id(tx: dict) -> Optional[str]:
-    """
-    Extract NFT position ID from a transaction's receives.
-    NFTs appear in MINT transactions with amount=1 and hash-like token_id.
-    """
-    for r in tx.get("receives", []) or []:
-        token_id = r.get("token_id", "")
-        amount = r.get("amount", 0)
-        if _is_nft_token(token_id, amount):
-            return token_id
-    return None
+# project_id keywords checked in order; the first match decides the type
+_PROJECT_TYPE_KEYWORDS = (
+    ("perpetual", _PERP_PROTOCOLS),
+    ("lp", _LP_PROTOCOLS),
+    ("yield", _YIELD_PROTOCOLS),
+)
 
 
-def _get_pool_addresses(tx: dict) -> list[str]:
-    """
-    Extract all pool addresses from a transaction.
-    Pool addresses appear in to_addr (sends) and from_addr (receives).
-    """
-    pool_addrs = set()
-    
-    for s in tx.get("sends", []) or []:
-        to_addr = s.get("to_addr", "")
-        if to_addr and to_addr != "0x0000000000000000000000000000000000000000":
-            pool_addrs.add(to_addr.lower())
-    
-    for r in tx.get("receives", []) or []:
-        from_addr = r.get("from_addr", "")
-        amount = r.get("amount", 0)
-        token_id = r.get("token_id", "")
-        if _is_nft_token(token_id, amount):
-            continue
-        if from_addr and from_addr != "0x0000000000000000000000000000000000000000":
-            pool_addrs.add(from_addr.lower())
-    
-    return list(pool_addrs)
+@dataclass(slots=True)
+class TxFeatures:
+    """Everything group_transactions needs from a tx's transfers, gathered in one pass."""
+    total_in: float
+    total_out: float
+    tokens: list[str]
+    tokens_set: frozenset[str]
+    tokens_str: str  # "A/B" display form, "Unknown" when there are no tokens
+    nft_id: Optional[str]
+    pool_addrs: list[str]
+
 
+# === Helper Functions (must be defined first) ===
 
+@lru_cache(maxsize=1024)
 def _is_lp_protocol(project_id: str) -> bool:
     """Check if project is an LP protocol that uses NFT positions."""
     if not project_id:
         return False
     project_lower = project_id.lower()
-    return any(x in project_lower for x in ["uniswap", "pancake", "sushi", "aero", "velo"])
+    return any(x in project_lower for x in _NFT_LP_PROTOCOLS)
 
 
-# === Main Functions ===
+def _resolve_token(
+    token_id: str,
+    token_dict: dict,
+    token_dict_lower: dict,
+    token_cache: dict[str, tuple[float, str, bool]]
+) -> tuple[float, str, bool]:
+    """
+    (price, SYMBOL, is_scam) for a token from token_dict, memoized per token_id.
 
-def infer_flow_direction(tx: dict, token_dict: dict) -> tuple[str, float, float, float]:
+    Price comes from an exact token_id match; symbol and scam flag fall back
+    to a case-insensitive match. The symbol is upper-cased once here.
     """
-    Infer the flow direction of a transaction based on net value.
-    
-    Returns: (direction, net_value, total_in, total_out)
+    resolved = token_cache.get(token_id)
+    if resolved is None:
+        exact = token_dict.get(token_id) or _EMPTY_INFO
+        token_info = exact or token_dict_lower.get(token_id.lower(), _EMPTY_INFO)
+        resolved = token_cache[token_id] = (
+            exact.get("price", 0) or 0,
+            (token_info.get("symbol") or token_info.get("optimized_symbol") or "").upper(),
+            bool(token_info.get("is_scam")),
+        )
+    return resolved
+
+
+def _canonical_tokens(
+    tokens: set[str],
+    tokens_cache: dict[frozenset[str], tuple[list[str], frozenset[str], str]]
+) -> tuple[list[str], frozenset[str], str]:
+    """
+    (sorted list, frozenset, display string) for a token set, memoized per
+    distinct combination; transactions on the same pair share one entry.
+    """
+    key = frozenset(tokens)
+    canonical = tokens_cache.get(key)
+    if canonical is None:
+        ordered = sorted(key)
+        canonical = tokens_cache[key] = (ordered, key, "/".join(ordered) if ordered else "Unknown")
+    return canonical
+
+
+def _tx_features(
+    tx: dict,
+    token_dict: dict,
+    token_dict_lower: dict,
+    token_cache: dict[str, tuple[float, str, bool]],
+    tokens_cache: dict[frozenset[str], tuple[list[str], frozenset[str], str]],
+    lp: bool = True
+) -> TxFeatures:
+    """
+    Scan a transaction's sends and receives once, collecting USD totals,
+    token symbols, the minted NFT id and the pool addresses together.
+
+    Pool addresses only matter for NFT LP protocols; pass lp=False to skip
+    collecting them (pool_addrs comes back empty).
+
+    Symbol priority: transfer symbol > token_dict symbol > optimized_symbol;
+    unknown and scam tokens are skipped (no truncated addresses).
+    NFTs (amount=1, hash-like ID without 0x prefix) are checked inline.
     """
-    sends = tx.get("sends", []) or []
-    receives = tx.get("receives", []) or []
-    
     total_out = 0.0
     total_in = 0.0
-    
-    for s in sends:
+    tokens = set()
+    nft_id = None
+    pool_addrs: dict[str, None] = {}  # insertion-ordered set
+
+    for s in tx.get("sends") or _EMPTY:
         token_id = s.get("token_id", "")
-        amount = float(s.get("amount", 0))
+        raw_amount = s.get("amount", 0)
+        dict_price, dict_symbol, is_scam = _resolve_token(token_id, token_dict, token_dict_lower, token_cache)
         price = s.get("price_usd")
         if price is None:
-            price = token_dict.get(token_id, {}).get("price", 0) or 0
-        total_out += amount * price
-    
-    for r in receives:
+            price = dict_price
+        total_out += float(raw_amount) * price
+
+        if not (raw_amount == 1 and len(token_id) >= 20 and not token_id.startswith("0x")):
+            symbol = s.get("symbol")
+            symbol = symbol.upper() if symbol else dict_symbol
+            if symbol and not is_scam:
+                tokens.add(symbol)
+
+        if lp:
+            to_addr = s.get("to_addr", "")
+            if to_addr and to_addr != _ZERO_ADDRESS:
+                pool_addrs[to_addr.lower()] = None
+
+    for r in tx.get("receives") or _EMPTY:
         token_id = r.get("token_id", "")
-        amount = float(r.get("amount", 0))
-        if _is_nft_token(token_id, amount):
+        raw_amount = r.get("amount", 0)
+        if raw_amount == 1 and len(token_id) >= 20 and not token_id.startswith("0x"):
+            if nft_id is None:
+                nft_id = token_id
             continue
-        price = r.get("price_usd")
-        if price is None:
-            price = token_dict.get(token_id, {}).get("price", 0) or 0
-        total_in += amount * price
-    
-    net_value = total_in - total_out
-    
+
+        dict_price, dict_symbol, is_scam = _resolve_token(token_id, token_dict, token_dict_lower, token_cache)
+        amount = float(raw_amount)
+        # Only differs from the check above for non-numeric amounts like "1"
+        if not (amount == 1 and len(token_id) >= 20 and not token_id.startswith("0x")):
+            price = r.get("price_usd")
+            if price is None:
+                price = dict_price
+            total_in += amount * price
+
+        symbol = r.get("symbol")
+        symbol = symbol.upper() if symbol else dict_symbol
+        if symbol and not is_scam:
+            tokens.add(symbol)
+
+        if lp:
+            from_addr = r.get("from_addr", "")
+            if from_addr and from_addr != _ZERO_ADDRESS:
+                pool_addrs[from_addr.lower()] = None
+
+    return TxFeatures(
+        total_in, total_out, *_canonical_tokens(tokens, tokens_cache), nft_id, list(pool_addrs)
+    )
+
+
+def _direction_from(features: TxFeatures) -> tuple[str, float]:
+    """(direction, net_value) from a transaction's USD totals."""
+    net_value = features.total_in - features.total_out
+
     if abs(net_value) < 1.0:
         direction = "OVERHEAD"
     elif net_value > 0:
         direction = "DECREASE"
     else:
         direction = "INCREASE"
+
+    return direction, net_value
+
+
+# === Main Functions ===
+
+def infer_flow_direction(tx: dict, token_dict: dict) -> tuple[str, float, float, float]:
+    """
+    Infer the flow direction of a transaction based on net value.
     
-    return direction, net_value, total_in, total_out
+    Returns: (direction, net_value, total_in, total_out)
+    """
+    features = _tx_features(tx, token_dict, _EMPTY_INFO, {}, {})
+    direction, net_value = _direction_from(features)
+    return direction, net_value, features.total_in, features.total_out
 
 
 def get_transaction_tokens(tx: dict, token_dict: dict) -> list[str]:
@@ -116,75 +213,86 @@ def get_transaction_tokens(tx: dict, token_dict: dict) -> list[str]:
     2. Symbol from token_dict (case-insensitive lookup)
     3. Skip unknown tokens (don't show truncated addresses)
     """
-    tokens = set()
-    
     # Build case-insensitive lookup for token_dict
     token_dict_lower = {k.lower(): v for k, v in token_dict.items()}
-    
-    for s in (tx.get("sends", []) or []):
-        token_id = s.get("token_id", "")
-        amount = s.get("amount", 0)
-        if _is_nft_token(token_id, amount):
-            continue
-        
-        # Case-insensitive token_dict lookup
-        token_info = token_dict.get(token_id) or token_dict_lower.get(token_id.lower(), {})
-        
-        # Priority: tx.symbol > token_dict.symbol > token_dict.optimized_symbol
-        symbol = s.get("symbol") or token_info.get("symbol") or token_info.get("optimized_symbol") or ""
-        
-        if symbol and not token_info.get("is_scam"):
-            tokens.add(symbol.upper())
-        # Don't add truncated addresses - just skip unknown tokens
-    
-    for r in (tx.get("receives", []) or []):
-        token_id = r.get("token_id", "")
-        amount = r.get("amount", 0)
-        if _is_nft_token(token_id, amount):
-            continue
-        
-        # Case-insensitive token_dict lookup
-        token_info = token_dict.get(token_id) or token_dict_lower.get(token_id.lower(), {})
-        
-        # Priority: tx.symbol > token_dict.symbol > token_dict.optimized_symbol
-        symbol = r.get("symbol") or token_info.get("symbol") or token_info.get("optimized_symbol") or ""
-        
-        if symbol and not token_info.get("is_scam"):
-            tokens.add(symbol.upper())
-        # Don't add truncated addresses - just skip unknown tokens
-    
-    return sorted(list(tokens))
+    return list(_tx_features(tx, token_dict, token_dict_lower, {}, {}).tokens)
 
 
 def infer_position_type(tx: dict) -> str:
     """Infer position type from transaction characteristics."""
-    tx_name = (tx.get("tx", {}).get("name") or "").lower()
-    project_id = (tx.get("project_id") or "").lower()
-    
-    # Perpetual indicators
-    if any(x in project_id for x in ["gmx", "gains", "kwenta", "perp"]):
-        return "perpetual"
-    
-    # LP indicators
-    lp_actions = ["addliquidity", "removeliquidity", "mint", "burn", 
-                  "increaseliquidity", "decreaseliquidity", "collect", "multicall"]
-    lp_protocols = ["uniswap", "pancake", "sushi", "curve", "balancer", "aero", "velo"]
-    
-    if any(x in tx_name for x in lp_actions):
-        if any(x in project_id for x in lp_protocols):
-            return "lp"
-    if any(x in project_id for x in lp_protocols):
-        return "lp"
-    
-    # Yield/lending indicators
-    if any(x in tx_name for x in ["deposit", "withdraw", "supply", "borrow", "repay"]):
-        return "yield"
-    if any(x in project_id for x in ["aave", "compound", "euler", "silo", "morpho"]):
+    position_type = _classify_by_project(tx.get("project_id") or "")
+    if position_type is not None:
+        return position_type
+    return _classify_by_tx_name((tx.get("tx") or _EMPTY_INFO).get("name") or "")
+
+
+@lru_cache(maxsize=1024)
+def _classify_by_project(project_id: str) -> Optional[str]:
+    """
+    Position type implied by project_id alone, or None if it doesn't decide it.
+
+    Memoized: a wallet touches only a handful of distinct protocols.
+    """
+    project_id = project_id.lower()
+    for position_type, keywords in _PROJECT_TYPE_KEYWORDS:
+        if any(x in project_id for x in keywords):
+            return position_type
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _classify_by_tx_name(tx_name: str) -> str:
+    """Position type from the tx name, for projects _classify_by_project can't place."""
+    tx_name = tx_name.lower()
+    if any(x in tx_name for x in _YIELD_ACTIONS):
         return "yield"
-    
     return "other"
 
 
+# Group keys are tuples while grouping: (chain, project_id, type, discriminator),
+# where the discriminator is a tokens string or a ("nft" | "pool", id) pair.
+# They're rendered as "chain|project|type|..." strings only for the output.
+GroupKey = tuple[str, str, str, Any]
+
+
+def _group_key_str(group_key: GroupKey) -> str:
+    """Render a group key as its "chain|project|type|..." string form."""
+    chain, project_id, pos_type, discriminator = group_key
+    if isinstance(discriminator, tuple):
+        discriminator = f"{discriminator[0]}:{discriminator[1]}"
+    return f"{chain}|{project_id}|{pos_type}|{discriminator}"
+
+
+def _new_group(
+    chain: str,
+    project_id: str,
+    protocol_name: str,
+    pos_type: str,
+    tokens: list[str],
+    display_tokens: str,
+    nft_id: Optional[str]
+) -> dict[str, Any]:
+    """
+    Empty group skeleton, described by the transaction that opened it.
+
+    groupKey is filled in with the rendered key once grouping is done.
+    """
+    return {
+        "groupKey": None,
+        "chain": chain,
+        "protocol": project_id,
+        "protocolName": protocol_name,
+        "positionType": pos_type,
+        "tokens": tokens,
+        "tokensDisplay": display_tokens,
+        "nftId": nft_id,
+        "transactions": [],
+        "totalIn": 0.0,
+        "totalOut": 0.0,
+        "latestActivity": 0,
+    }
+
+
 def group_transactions(
     transactions: list[dict],
     token_dict: dict,
@@ -201,38 +309,58 @@ def group_transactions(
     2. Second pass: Match other txs to NFT positions by pool address
     """
     
+    # Only NFT LP protocol txs take part in mint registration and pool
+    # matching; everything else skips the pool-address work
+    lp_flags = [_is_lp_protocol(tx.get("project_id") or "") for tx in transactions]
+
+    # Scan each transaction's transfers once; both passes reuse the result.
+    # Token lookups are resolved once per token_id for the whole call.
+    token_dict_lower = {k.lower(): v for k, v in token_dict.items()}
+    token_cache: dict[str, tuple[float, str, bool]] = {}
+    tokens_cache: dict[frozenset[str], tuple[list[str], frozenset[str], str]] = {}
+    tx_features = [
+        _tx_features(tx, token_dict, token_dict_lower, token_cache, tokens_cache, is_lp)
+        for tx, is_lp in zip(transactions, lp_flags)
+    ]
+
     # === FIRST PASS: Build NFT position registry from MINT transactions ===
-    # Maps pool_address -> list of {nft_id, tokens, chain, protocol, mint_time}
-    nft_positions: dict[str, list[dict]] = defaultdict(list)
+    # Maps (pool_address, chain, protocol) -> list of {nft_id, tokens, tokens_set, tokens_str, chain, protocol, mint_time}
+    nft_positions: dict[tuple[str, str, str], list[dict]] = defaultdict(list)
     
-    for tx in transactions:
-        project_id = tx.get("project_id") or ""
-        if not _is_lp_protocol(project_id):
+    for tx, features, is_lp in zip(transactions, tx_features, lp_flags):
+        if not is_lp:
             continue
+        project_id = tx.get("project_id") or ""
         
-        nft_id = _extract_nft_id(tx)
+        nft_id = features.nft_id
         if not nft_id:
             continue
         
         # This is a MINT transaction - extract position info
-        pool_addrs = _get_pool_addresses(tx)
-        tokens = get_transaction_tokens(tx, token_dict)
+        pool_addrs = features.pool_addrs
+        tokens = features.tokens
         chain = tx.get("chain", "unknown")
         mint_time = tx.get("time_at", 0)
         
         for pool_addr in pool_addrs:
-            nft_positions[pool_addr].append({
+            nft_positions[(pool_addr, chain, project_id)].append({
                 "nft_id": nft_id,
                 "tokens": tokens,
+                "tokens_set": features.tokens_set,
+                "tokens_str": features.tokens_str,
                 "chain": chain,
                 "protocol": project_id,
                 "mint_time": mint_time,
             })
     
     # === SECOND PASS: Group all transactions ===
-    groups: dict[str, dict] = {}
+    groups: dict[GroupKey, dict] = {}
+    # Group and flow-annotated tx per input position; transactions are
+    # handed out to their groups afterwards in one time-ordered sweep
+    tx_groups: list[dict] = []
+    tx_flows: list[dict] = []
     
-    for tx in transactions:
+    for tx, features, is_lp in zip(transactions, tx_features, lp_flags):
         chain = tx.get("chain", "unknown")
         project_id = tx.get("project_id") or "unknown"
         pos_type = infer_position_type(tx)
@@ -242,8 +370,8 @@ def group_transactions(
         protocol_name = project_info.get("name") or project_id.replace("_", " ").title()
         
         # Get tokens from this transaction
-        tokens = get_transaction_tokens(tx, token_dict)
-        tokens_str = "/".join(tokens) if tokens else "Unknown"
+        tokens = features.tokens
+        tokens_str = features.tokens_str
         
         # Determine group key based on position type
         group_key = None
@@ -251,60 +379,58 @@ def group_transactions(
         nft_id = None
 
         
-        if pos_type == "lp" and _is_lp_protocol(project_id):
+        if pos_type == "lp" and is_lp:
             # LP Position: Try to match to an NFT position
-            pool_addrs = _get_pool_addresses(tx)
-            tx_nft_id = _extract_nft_id(tx)
+            pool_addrs = features.pool_addrs
+            tx_nft_id = features.nft_id
             
             if tx_nft_id:
                 # This is a MINT - use its own NFT ID
                 nft_id = tx_nft_id
-                group_key = f"{chain}|{project_id}|lp|nft:{nft_id}"
+                group_key = (chain, project_id, "lp", ("nft", nft_id))
                 display_tokens = tokens_str
             else:
                 # Try to match to a known NFT position by pool address
                 matched_position = None
                 for pool_addr in pool_addrs:
-                    if pool_addr in nft_positions:
-                        # Find the best matching position (same chain/protocol)
-                        candidates = [p for p in nft_positions[pool_addr] 
-                                     if p["chain"] == chain and p["protocol"] == project_id]
-                        if candidates:
-                            if len(candidates) == 1:
-                                matched_position = candidates[0]
-                            else:
-                                # Multiple positions in same pool - match by token overlap
-                                best_match = None
-                                best_overlap = 0
-                                for cand in candidates:
-                                    overlap = len(set(tokens) & set(cand["tokens"]))
-                                    if overlap > best_overlap:
-                                        best_overlap = overlap
-                                        best_match = cand
-                                matched_position = best_match or candidates[0]
-                            break
+                    # Positions in this pool on the same chain/protocol
+                    candidates = nft_positions.get((pool_addr, chain, project_id))
+                    if candidates:
+                        if len(candidates) == 1:
+                            matched_position = candidates[0]
+                        else:
+                            # Multiple positions in same pool - match by token overlap
+                            # (first candidate wins ties, including no overlap at all)
+                            tx_tokens_set = features.tokens_set
+                            matched_position = max(
+                                candidates,
+                                key=lambda cand: len(tx_tokens_set & cand["tokens_set"])
+                            )
+                        break
                 
                 if matched_position:
                     nft_id = matched_position["nft_id"]
-                    group_key = f"{chain}|{project_id}|lp|nft:{nft_id}"
+                    group_key = (chain, project_id, "lp", ("nft", nft_id))
                     if matched_position["tokens"]:
-                        display_tokens = "/".join(matched_position["tokens"])
+                        display_tokens = matched_position["tokens_str"]
                 else:
                     # No NFT match - fall back to pool address grouping
                     pool_addr = pool_addrs[0] if pool_addrs else "unknown"
-                    group_key = f"{chain}|{project_id}|lp|pool:{pool_addr}"
+                    group_key = (chain, project_id, "lp", ("pool", pool_addr))
         
         elif pos_type == "perpetual":
             # Perp: Group by tokens (market)
-            group_key = f"{chain}|{project_id}|perpetual|{tokens_str}"
+            group_key = (chain, project_id, "perpetual", tokens_str)
         
         else:
             # Other: Group by protocol + tokens
-            group_key = f"{chain}|{project_id}|{pos_type}|{tokens_str}"
+            group_key = (chain, project_id, pos_type, tokens_str)
 
         
         # Infer flow direction
-        direction, net_value, total_in, total_out = infer_flow_direction(tx, token_dict)
+        direction, net_value = _direction_from(features)
+        total_in = features.total_in
+        total_out = features.total_out
         
         # Add flow info and NFT ID to transaction
         tx_with_flow = {
@@ -316,43 +442,40 @@ def group_transactions(
             "_nftId": nft_id,
         }
         
-        # Add to group
-        if group_key not in groups:
-            groups[group_key] = {
-                "groupKey": group_key,
-                "chain": chain,
-                "protocol": project_id,
-                "protocolName": protocol_name,
-                "positionType": pos_type,
-                "tokens": tokens,
-                "tokensDisplay": display_tokens,
-                "nftId": nft_id,
-                "transactions": [],
-                "totalIn": 0.0,
-                "totalOut": 0.0,
-                "latestActivity": 0,
-            }
+        # Add to group (single lookup; the group is created on first sight)
+        group = groups.get(group_key)
+        if group is None:
+            group = groups[group_key] = _new_group(
+                chain, project_id, protocol_name, pos_type,
+                tokens, display_tokens, nft_id
+            )
         
-        groups[group_key]["transactions"].append(tx_with_flow)
-        groups[group_key]["totalIn"] += total_in
-        groups[group_key]["totalOut"] += total_out
+        tx_groups.append(group)
+        tx_flows.append(tx_with_flow)
+        group["totalIn"] += total_in
+        group["totalOut"] += total_out
         
         # Update tokens display if this tx has better token info
-        if tokens and groups[group_key]["tokensDisplay"] in ["Unknown", ""]:
-            groups[group_key]["tokensDisplay"] = tokens_str
-            groups[group_key]["tokens"] = tokens
+        if tokens and group["tokensDisplay"] in ("Unknown", ""):
+            group["tokensDisplay"] = tokens_str
+            group["tokens"] = tokens
         
-        tx_time = tx.get("time_at", 0)
-        if tx_time > groups[group_key]["latestActivity"]:
-            groups[group_key]["latestActivity"] = tx_time
+        group["latestActivity"] = max(group["latestActivity"], tx.get("time_at", 0))
     
     # Convert to list and sort by latest activity (most recent first)
+    for group_key, group in groups.items():
+        group["groupKey"] = _group_key_str(group_key)
     result = list(groups.values())
-    result.sort(key=lambda g: -g["latestActivity"])
+    result.sort(key=_LATEST_ACTIVITY, reverse=True)
+    
+    # Fill each group's transactions most recent first: one stable sort over
+    # all positions instead of a sort per group (near-linear when the input
+    # already arrives newest first, as DeBank pages it)
+    times = [tx.get("time_at", 0) for tx in transactions]
+    for i in sorted(range(len(times)), key=times.__getitem__, reverse=True):
+        tx_groups[i]["transactions"].append(tx_flows[i])
     
-    # Sort transactions within each group by time (most recent first)
     for group in result:
-        group["transactions"].sort(key=lambda t: -t.get("time_at", 0))
         group["transactionCount"] = len(group["transactions"])
         group["netValue"] = group["totalIn"] - group["totalOut"]
     
@@ -10,20 +10,40 @@ Architecture:
 - Enrichment: Subgraphs (on-demand, not in this endpoint)
 """
 
-from fastapi import APIRouter, HTTPException, Query
-from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from typing import Any, Iterable, Optional
+from collections import Counter
 from datetime import datetime, timedelta
+from functools import lru_cache
+import base64
+import hashlib
+import heapq
 import logging
+import math
+import re
 
-from backend.services.discovery import get_discovery_service, DEFAULT_CHAIN_NAMES
+from backend.services.discovery import (
+    get_discovery_service,
+    TransactionDiscoveryService,
+    DEFAULT_CHAIN_NAMES,
+)
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Seconds an assembled transactions page is served from Redis
+TRANSACTIONS_CACHE_TTL = 60
+
+# Relative date formats for _parse_date: "<n><unit>" -> n * days per unit
+_RELATIVE_DATE = re.compile(r"([+-]?\d+)([dmy])")
+_RELATIVE_UNIT_DAYS = {"d": 1, "m": 30, "y": 365}
 
 
 @router.get("/wallet/{address}/transactions")
 async def get_wallet_transactions(
     address: str,
+    request: Request,
     since: Optional[str] = Query(
         None, 
         description="Start date (ISO format or relative like '30d', '6m')"
@@ -45,8 +65,13 @@ async def get_wallet_transactions(
         description="Force full refresh, clearing cache"
     ),
     page: int = Query(1, ge=1, description="Page number"),
-    limit: int = Query(50, ge=1, le=200, description="Items per page")
-) -> dict[str, Any]:
+    limit: int = Query(50, ge=1, le=200, description="Items per page"),
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset cursor (pagination.nextCursor); pass empty to start cursor paging"
+    ),
+    discovery: TransactionDiscoveryService = Depends(get_discovery_service)
+) -> Response:
     """
     Discover all transactions for a wallet.
     
@@ -60,52 +85,134 @@ async def get_wallet_transactions(
     Date formats:
     - ISO: "2024-01-01" or "2024-01-01T00:00:00Z"
     - Relative: "30d" (30 days), "6m" (6 months), "1y" (1 year)
+    
+    Responses carry an ETag; clients polling with If-None-Match get a
+    304 while the cached transaction set and query are unchanged.
+    
+    Assembled pages are cached in Redis for TRANSACTIONS_CACHE_TTL seconds,
+    keyed by the raw query; force_refresh bypasses the lookup.
+    
+    Pagination is by page/limit, or by keyset when cursor is given: pages
+    run newest first by (time_at, id), and each carries the nextCursor
+    for the following one. Discovery is then bounded to the cursor's time.
     """
     try:
         # Parse date range
-        until_dt = _parse_date(until) if until else datetime.now()
+        now = datetime.now()
+        until_dt = _parse_date(until, now) if until else now
         
         if since:
-            since_dt = _parse_date(since)
+            since_dt = _parse_date(since, now)
         else:
             # Default to 6 months
             since_dt = until_dt - timedelta(days=180)
         
+        cursor_key = _decode_cursor(cursor) if cursor else None
+        
+        # Serve a recently assembled page for the same query
+        response_cache = discovery.response_cache
+        cache_key = f"transactions:{_digest(address.lower(), since, until, chain, project, page, limit, cursor)}"
+        if response_cache and not force_refresh:
+            cached = await response_cache.get(cache_key)
+            if cached:
+                etag = cached["etag"]
+                if request.headers.get("if-none-match") == etag:
+                    return Response(status_code=304, headers={"ETag": etag})
+                return ORJSONResponse(cached["body"], headers={"ETag": etag})
+        
         # Determine chains to query
         chains = [chain] if chain else None  # None = all chains
         
+        # Nothing newer than the cursor is needed
+        discovery_until = until_dt
+        if cursor_key:
+            discovery_until = min(
+                until_dt, datetime.fromtimestamp(math.ceil(cursor_key[0]), tz=until_dt.tzinfo)
+            )
+        
         # Discover transactions via DeBank
-        discovery = await get_discovery_service()
         result = await discovery.discover_transactions(
             wallet_address=address,
             chains=chains,
             since=since_dt,
-            until=until_dt,
+            until=discovery_until,
             force_refresh=force_refresh
         )
         
         all_transactions = result["transactions"]
         
-        # Filter by project if specified
+        # Filter by project if specified (via the discovery index when present).
+        # Only positions are kept; just the requested page is materialized.
+        positions = None
         if project:
-            all_transactions = [
-                tx for tx in all_transactions 
-                if tx.get("project_id") == project
-            ]
+            project_index = result.get("project_index")
+            if project_index is not None:
+                positions = project_index.get(project, [])
+            else:
+                positions = [
+                    i for i, tx in enumerate(all_transactions)
+                    if tx.get("project_id") == project
+                ]
         
         # Calculate pagination
-        total = len(all_transactions)
-        total_pages = (total + limit - 1) // limit if total > 0 else 1
-        start_idx = (page - 1) * limit
-        end_idx = start_idx + limit
+        if cursor is not None:
+            # Keyset: everything strictly after the cursor, counted in the
+            # same pass that keeps the page (plus one row to tell whether
+            # another page follows)
+            candidates = (
+                map(all_transactions.__getitem__, positions)
+                if positions is not None else all_transactions
+            )
+            rows, total = _keyset_page(candidates, cursor_key, limit + 1)
+        else:
+            total = len(positions) if positions is not None else len(all_transactions)
         
-        # Slice for current page
-        page_transactions = all_transactions[start_idx:end_idx]
+        # Conditional response: skip the payload if nothing changed
+        cache_info = result.get("cache", {})
+        etag = _build_etag(
+            address.lower(), cache_info.get("total_cached"), cache_info.get("newest_date"),
+            total, since, until, chain, project, page, limit, cursor
+        )
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        if cursor is not None:
+            page_transactions = rows[:limit]
+            next_cursor = _encode_cursor(page_transactions[-1]) if len(rows) > limit else None
+            pagination = {
+                "limit": limit,
+                "total": total,
+                "cursor": cursor,
+                "nextCursor": next_cursor,
+                "hasMore": next_cursor is not None
+            }
+        else:
+            total_pages = (total + limit - 1) // limit if total > 0 else 1
+            start_idx = (page - 1) * limit
+            end_idx = start_idx + limit
+            
+            # Slice for current page
+            if positions is not None:
+                page_transactions = [all_transactions[i] for i in positions[start_idx:end_idx]]
+            else:
+                page_transactions = all_transactions[start_idx:end_idx]
+            pagination = {
+                "page": page,
+                "limit": limit,
+                "total": total,
+                "totalPages": total_pages,
+                "hasMore": page < total_pages
+            }
         
-        # Rebuild summary after filtering
-        summary = _build_summary(all_transactions) if project else result["summary"]
+        if positions is not None:
+            # Rebuild summary for the filtered transactions
+            summary = _build_summary(
+                map(all_transactions.__getitem__, positions), project=project
+            )
+        else:
+            summary = result["summary"]
         
-        return {
+        body = {
             "status": "success",
             "data": {
                 "transactions": page_transactions,
@@ -113,13 +220,7 @@ async def get_wallet_transactions(
                 "tokenDict": result["token_dict"],
                 "projectDict": result["project_dict"],
                 "chainNames": result.get("chain_names", DEFAULT_CHAIN_NAMES),
-                "pagination": {
-                    "page": page,
-                    "limit": limit,
-                    "total": total,
-                    "totalPages": total_pages,
-                    "hasMore": page < total_pages
-                },
+                "pagination": pagination,
                 "filters": {
                     "since": since_dt.isoformat(),
                     "until": until_dt.isoformat(),
@@ -132,6 +233,10 @@ async def get_wallet_transactions(
                 "cache": result.get("cache", {})
             }
         }
+        if response_cache:
+            await response_cache.set(cache_key, {"etag": etag, "body": body}, TRANSACTIONS_CACHE_TTL)
+        # The raw DeBank dicts go straight to orjson, no response-model pass
+        return ORJSONResponse(body, headers={"ETag": etag})
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail={"error": str(e)})
@@ -143,38 +248,97 @@ async def get_wallet_transactions(
         )
 
 
-def _parse_date(date_str: str) -> datetime:
+def _keyset_key(tx: dict) -> tuple[float, str]:
+    """Sort key for keyset pagination: (time_at, id), newest first when descending"""
+    return (tx.get("time_at") or 0, tx.get("id") or "")
+
+
+def _keyset_page(
+    transactions: Iterable[dict],
+    cursor_key: Optional[tuple[float, str]],
+    size: int
+) -> tuple[list[dict], int]:
+    """
+    Newest size transactions older than cursor_key, and how many there are.
+
+    One pass with a bounded heap, so memory stays O(size) however many rows
+    precede the cursor; the scan itself is still O(n). Ties keep input order,
+    as heapq.nlargest would.
+    """
+    heap: list[tuple[tuple[float, str], int, dict]] = []
+    total = 0
+    for tx in transactions:
+        key = _keyset_key(tx)
+        if cursor_key is not None and key >= cursor_key:
+            continue
+        entry = (key, -total, tx)
+        total += 1
+        if len(heap) < size:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+    heap.sort(reverse=True)
+    return [entry[2] for entry in heap], total
+
+
+def _encode_cursor(tx: dict) -> str:
+    """Opaque cursor pointing just past tx"""
+    time_at, tx_id = _keyset_key(tx)
+    return base64.urlsafe_b64encode(f"{time_at}:{tx_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[float, str]:
+    """Inverse of _encode_cursor"""
+    try:
+        time_at, tx_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":", 1)
+        time_at = float(time_at)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    # inf / nan parse as floats but cannot bound discovery
+    if not math.isfinite(time_at):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return time_at, tx_id
+
+
+def _digest(*parts: Any) -> str:
+    """Short hex digest of the values that determine a response"""
+    key = "|".join(str(p) for p in parts)
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _build_etag(*parts: Any) -> str:
+    """Build a quoted ETag from the values that determine a response"""
+    return f'"{_digest(*parts)}"'
+
+
+def _parse_date(date_str: str, now: Optional[datetime] = None) -> datetime:
     """
     Parse date string in various formats.
     
     Supported formats:
     - ISO: "2024-01-01", "2024-01-01T00:00:00Z"
     - Relative: "30d" (days), "6m" (months), "1y" (years)
+    
+    Relative dates count back from now (taken once per request by the
+    caller; defaults to the current time).
     """
+    if now is None:
+        now = datetime.now()
     if not date_str:
-        return datetime.now()
+        return now
     
     # Check for relative format
-    if date_str.endswith('d'):
-        try:
-            days = int(date_str[:-1])
-            return datetime.now() - timedelta(days=days)
-        except ValueError:
-            pass
-    elif date_str.endswith('m'):
-        try:
-            months = int(date_str[:-1])
-            return datetime.now() - timedelta(days=months * 30)
-        except ValueError:
-            pass
-    elif date_str.endswith('y'):
-        try:
-            years = int(date_str[:-1])
-            return datetime.now() - timedelta(days=years * 365)
-        except ValueError:
-            pass
+    relative = _RELATIVE_DATE.fullmatch(date_str)
+    if relative:
+        days = int(relative[1]) * _RELATIVE_UNIT_DAYS[relative[2]]
+        return now - timedelta(days=days)
     
-    # Try ISO format
+    return _parse_iso_date(date_str)
+
+
+@lru_cache(maxsize=128)
+def _parse_iso_date(date_str: str) -> datetime:
+    """Parse an ISO date string (memoized; clients repeat the same bounds)"""
     try:
         # Handle both with and without time
         if 'T' in date_str:
@@ -185,20 +349,26 @@ def _parse_date(date_str: str) -> datetime:
         raise ValueError(f"Invalid date format: {date_str}")
 
 
-def _build_summary(transactions: list[dict]) -> dict[str, Any]:
-    """Build summary statistics from transactions"""
-    by_chain = {}
-    by_project = {}
+def _build_summary(transactions: Iterable[dict], project: Optional[str] = None) -> dict[str, Any]:
+    """
+    Build summary statistics from transactions (any iterable, consumed once)
     
-    for tx in transactions:
-        chain = tx.get("chain", "unknown")
-        by_chain[chain] = by_chain.get(chain, 0) + 1
-        
-        project = tx.get("project_id") or "other"
-        by_project[project] = by_project.get(project, 0) + 1
+    Pass project when every transaction is already known to belong to it
+    (the project filter); byProject is then exact without a per-tx count.
+    """
+    if project:
+        by_chain = Counter(tx.get("chain", "unknown") for tx in transactions)
+        total = by_chain.total()
+        by_project = {project: total} if total else {}
+    else:
+        if not isinstance(transactions, list):
+            transactions = list(transactions)
+        total = len(transactions)
+        by_chain = Counter(tx.get("chain", "unknown") for tx in transactions)
+        by_project = Counter(tx.get("project_id") or "other" for tx in transactions)
     
     return {
-        "total": len(transactions),
-        "byChain": by_chain,
-        "byProject": by_project
+        "total": total,
+        "byChain": dict(by_chain),
+        "byProject": dict(by_project)
     }
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Any
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Any, Optional
+import asyncio
 import logging
-import os
 from backend.services.debank import get_debank_service, DeBankService
 from backend.services.coingecko import get_coingecko_service, CoinGeckoService
-from backend.services.thegraph import TheGraphService
-from backend.services.gmx_subgraph import GMXSubgraphService
+from backend.services.thegraph import (
+    get_thegraph_service, TheGraphService, POSITION_BUILD_CONCURRENCY
+)
+from backend.services.gmx_subgraph import get_gmx_subgraph_service, GMXSubgraphService
 from backend.core.errors import (
     DeBankError, RateLimitError, InvalidAddressError, ServiceUnavailableError
 )
@@ -13,14 +15,8 @@ from backend.core.errors import (
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-def get_thegraph_service() -> TheGraphService:
-    """Dependency for The Graph service"""
-    api_key = os.getenv("THEGRAPH_API_KEY", "")
-    return TheGraphService(api_key)
-
-def get_gmx_subgraph_service() -> GMXSubgraphService:
-    """Dependency for GMX subgraph service"""
-    return GMXSubgraphService()
+# Seconds a wallet's ledger response is served from Redis
+LEDGER_CACHE_TTL = 120
 
 
 @router.get("/wallet/{address}")
@@ -46,6 +42,10 @@ async def get_wallet_positions(
 @router.get("/wallet/{address}/ledger")
 async def get_wallet_ledger(
     address: str,
+    force_refresh: bool = Query(
+        False,
+        description="Bypass cached ledger and DeBank positions"
+    ),
     debank: DeBankService = Depends(get_debank_service),
     coingecko: CoinGeckoService = Depends(get_coingecko_service),
     thegraph: TheGraphService = Depends(get_thegraph_service),
@@ -58,88 +58,62 @@ async def get_wallet_ledger(
     - DeBank: Position discovery (find position IDs) + Perp positions
     - Uniswap Subgraph: LP position details (real-time, accurate)
     - CoinGecko: Historical prices for initial deposit USD values
+    
+    The assembled response is cached in Redis for LEDGER_CACHE_TTL seconds;
+    force_refresh skips the lookup and overwrites the entry.
     """
+    cache_key = f"ledger:{address.lower()}"
+    if debank.cache and not force_refresh:
+        cached = await debank.cache.get(cache_key)
+        if cached:
+            return cached
+    
     try:
-        # STEP 1: Use DeBank for LP position discovery only
-        positions_result = await debank.get_wallet_positions(address)
+        # STEP 1: Use DeBank for LP position discovery only. GMX rewards,
+        # perp positions (STEP 3, directly from GMX Subgraph) and GMX
+        # transactions don't depend on it, so all four calls run together.
+        positions_result, gmx_rewards, perp_positions, gmx_txs = await asyncio.gather(
+            debank.get_wallet_positions(address, force_refresh=force_refresh),
+            debank.get_gmx_rewards(address),
+            gmx_subgraph.get_full_positions(address),
+            debank.get_gmx_transactions(address),
+        )
         positions = positions_result.get("positions", [])
         
         # Only need LP positions from DeBank (for discovery)
         lp_positions_debank = [p for p in positions if "pool_name" in p]
         
-        # Get GMX rewards from DeBank
-        gmx_rewards = await debank.get_gmx_rewards(address)
+        # STEP 2: Enrich LP positions using Uniswap Subgraph (real-time data),
+        # POSITION_BUILD_CONCURRENCY at a time (each fans out into several
+        # subgraph queries); results keep DeBank's order
+        semaphore = asyncio.Semaphore(POSITION_BUILD_CONCURRENCY)
         
-        # STEP 2: Enrich LP positions using Uniswap Subgraph (real-time data)
-        enriched_lp_positions = []
-        earliest_position_mint = None
+        async def enrich(lp_debank: dict[str, Any]) -> Optional[dict[str, Any]]:
+            async with semaphore:
+                return await _enrich_lp_position(lp_debank, thegraph, coingecko, address)
         
-        for lp_debank in lp_positions_debank:
-            position_index = lp_debank.get("position_index", "")
-            
-            if not position_index:
-                logger.warning(f"LP position missing position_index, skipping")
-                continue
-            
-            # Get full position data from Uniswap subgraph
-            lp_subgraph = await thegraph.get_position_with_historical_values(
-                position_index, 
-                coingecko,
-                owner_address=address
-            )
-            
-            if not lp_subgraph:
-                logger.warning(f"Could not get subgraph data for position {position_index}")
-                continue
-            
-            # Track earliest position for perp history filtering
-            mint_ts = lp_subgraph.get("position_mint_timestamp", 0)
-            if mint_ts > 0:
-                if earliest_position_mint is None or mint_ts < earliest_position_mint:
-                    earliest_position_mint = mint_ts
-            
-            # Get unclaimed fees from DeBank (subgraph doesn't have real-time fees)
-            unclaimed_fees_usd = lp_debank.get("unclaimed_fees_usd", 0)
-            reward_tokens = lp_debank.get("reward_tokens", [])
-            
-            # Build enriched position combining subgraph + DeBank data
-            enriched_lp = {
-                "pool_name": lp_subgraph["pool_name"],
-                "pool_address": lp_subgraph["pool_address"],
-                "position_index": position_index,
-                "chain": lp_subgraph["chain"],
-                "fee_tier": lp_subgraph["fee_tier"],
-                "in_range": lp_subgraph["in_range"],
-                "token0": lp_subgraph["token0"],
-                "token1": lp_subgraph["token1"],
-                "total_value_usd": lp_subgraph["total_value_usd"],
-                "unclaimed_fees_usd": unclaimed_fees_usd,
-                "reward_tokens": reward_tokens,
-                "initial_deposits": lp_subgraph["initial_deposits"],
-                "initial_total_value_usd": lp_subgraph.get("initial_total_value_usd", 0),
-                "claimed_fees": lp_subgraph["collected_fees"],
-                "position_mint_timestamp": mint_ts,
-                "gas_fees_usd": lp_subgraph.get("gas_fees_usd", 0),
-                "transaction_count": lp_subgraph.get("transaction_count", 0),
-                # Tick range for price bounds visualization
-                "tick_lower": lp_subgraph.get("tick_lower"),
-                "tick_upper": lp_subgraph.get("tick_upper"),
-                "current_tick": lp_subgraph.get("current_tick"),
-            }
-            enriched_lp_positions.append(enriched_lp)
+        enriched = await asyncio.gather(*(enrich(p) for p in lp_positions_debank))
+        enriched_lp_positions = [lp for lp in enriched if lp is not None]
         
-        # STEP 3: Get Perp positions directly from GMX Subgraph
-        perp_positions = await gmx_subgraph.get_full_positions(address)
+        # Track earliest position for perp history filtering
+        mint_timestamps = [
+            lp["position_mint_timestamp"] for lp in enriched_lp_positions
+            if lp["position_mint_timestamp"] > 0
+        ]
+        earliest_position_mint = min(mint_timestamps) if mint_timestamps else None
         
         # Get realized P&L from GMX subgraph (filtered to trades after LP mint)
-        gmx_pnl = await gmx_subgraph.get_realized_pnl(address, earliest_position_mint)
-        
-        # Get funding info from DeBank (still useful for funding tracking)
+        # alongside funding info from DeBank (still useful for funding tracking)
         total_perp_margin = sum(p.get("margin_token", {}).get("value_usd", 0) for p in perp_positions)
         perp_history = {"realized_pnl": 0, "current_margin": total_perp_margin, "total_funding_claimed": 0}
         if earliest_position_mint:
-            debank_history = await debank.get_perp_realized_pnl(address, earliest_position_mint, total_perp_margin)
+            gmx_pnl, debank_history = await asyncio.gather(
+                gmx_subgraph.get_realized_pnl(address, earliest_position_mint),
+                debank.get_perp_realized_pnl(address, earliest_position_mint, total_perp_margin),
+            )
             perp_history["total_funding_claimed"] = debank_history.get("total_funding_claimed", 0)
+        else:
+            gmx_pnl = await gmx_subgraph.get_realized_pnl(address, earliest_position_mint)
         
         # Use GMX subgraph for realized P&L (more accurate)
         perp_history["realized_pnl"] = gmx_pnl.get("total_realized_pnl", 0)
@@ -151,11 +125,10 @@ async def get_wallet_ledger(
             perp["funding_rewards_usd"] = perp_history.get("total_funding_claimed", 0) * proportion
         
         # Calculate total gas fees
-        gmx_txs = await debank.get_gmx_transactions(address)
         lp_gas = sum(lp.get("gas_fees_usd", 0) for lp in enriched_lp_positions)
         gmx_gas = gmx_txs.get("total_gas_usd", 0)
         
-        return {
+        result = {
             "status": "success",
             "data": {
                 "wallet": address,
@@ -175,6 +148,9 @@ async def get_wallet_ledger(
                 }
             }
         }
+        if debank.cache:
+            await debank.cache.set(cache_key, result, LEDGER_CACHE_TTL)
+        return result
         
     except RateLimitError as e:
         raise HTTPException(status_code=429, detail={"error_code": e.code, "message": e.user_msg})
@@ -187,6 +163,60 @@ async def get_wallet_ledger(
         raise HTTPException(status_code=500, detail={"error_code": "UNKNOWN", "message": str(e)})
 
 
+async def _enrich_lp_position(
+    lp_debank: dict[str, Any],
+    thegraph: TheGraphService,
+    coingecko: CoinGeckoService,
+    address: str
+) -> Optional[dict[str, Any]]:
+    """Combine a DeBank LP position with its Uniswap subgraph data (None if unavailable)"""
+    position_index = lp_debank.get("position_index", "")
+    
+    if not position_index:
+        logger.warning(f"LP position missing position_index, skipping")
+        return None
+    
+    # Get full position data from Uniswap subgraph
+    lp_subgraph = await thegraph.get_position_with_historical_values(
+        position_index, 
+        coingecko,
+        owner_address=address
+    )
+    
+    if not lp_subgraph:
+        logger.warning(f"Could not get subgraph data for position {position_index}")
+        return None
+    
+    # Get unclaimed fees from DeBank (subgraph doesn't have real-time fees)
+    unclaimed_fees_usd = lp_debank.get("unclaimed_fees_usd", 0)
+    reward_tokens = lp_debank.get("reward_tokens", [])
+    
+    # Build enriched position combining subgraph + DeBank data
+    return {
+        "pool_name": lp_subgraph["pool_name"],
+        "pool_address": lp_subgraph["pool_address"],
+        "position_index": position_index,
+        "chain": lp_subgraph["chain"],
+        "fee_tier": lp_subgraph["fee_tier"],
+        "in_range": lp_subgraph["in_range"],
+        "token0": lp_subgraph["token0"],
+        "token1": lp_subgraph["token1"],
+        "total_value_usd": lp_subgraph["total_value_usd"],
+        "unclaimed_fees_usd": unclaimed_fees_usd,
+        "reward_tokens": reward_tokens,
+        "initial_deposits": lp_subgraph["initial_deposits"],
+        "initial_total_value_usd": lp_subgraph.get("initial_total_value_usd", 0),
+        "claimed_fees": lp_subgraph["collected_fees"],
+        "position_mint_timestamp": lp_subgraph.get("position_mint_timestamp", 0),
+        "gas_fees_usd": lp_subgraph.get("gas_fees_usd", 0),
+        "transaction_count": lp_subgraph.get("transaction_count", 0),
+        # Tick range for price bounds visualization
+        "tick_lower": lp_subgraph.get("tick_lower"),
+        "tick_upper": lp_subgraph.get("tick_upper"),
+        "current_tick": lp_subgraph.get("current_tick"),
+    }
+
+
 @router.get("/wallet/{address}/raw")
 async def get_wallet_positions_raw(
     address: str,
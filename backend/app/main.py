@@ -8,7 +8,10 @@ import logging
 from backend.core.config import settings
 from backend.core.logging_config import setup_logging
 from backend.services.debank import close_debank_service
+from backend.services.discovery import close_discovery_service
 from backend.services.coingecko import close_coingecko_service
+from backend.services.thegraph import close_thegraph_service
+from backend.services.gmx_subgraph import close_gmx_subgraph_service
 from backend.app.api.v1 import wallet
 from backend.app.api.v1 import transactions
 from backend.app.api.v1 import build
@@ -23,8 +26,11 @@ async def lifespan(app: FastAPI):
     logger.info("Starting LP Dashboard API")
     yield
     logger.info("Shutting down LP Dashboard API")
+    await close_discovery_service()
     await close_debank_service()
     await close_coingecko_service()
+    await close_thegraph_service()
+    await close_gmx_subgraph_service()
 
 app = FastAPI(
     title="LP Dashboard API",
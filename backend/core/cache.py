@@ -1,7 +1,9 @@
 import redis.asyncio as redis
 import json
 import logging
-from typing import Optional
+import threading
+import time
+from typing import Any, Hashable, Optional
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -61,6 +63,41 @@ class CacheService:
         """Close Redis connection"""
         await self.redis.close()
 
+class TTLCache:
+    """
+    In-process cache with per-entry expiry, for short-lived endpoint payloads
+
+    Safe to share between the event loop and asyncio.to_thread workers:
+    every operation holds a lock, so eviction never iterates a dict another
+    thread is resizing and the size bound holds.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 256):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._data: dict[Hashable, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Set cached value, evicting the oldest entry when full"""
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.max_entries:
+                del self._data[next(iter(self._data))]
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+
 def cache_key_for_wallet(address: str) -> str:
     """Generate cache key for wallet positions"""
     # Bucket by 5-minute intervals to increase cache hit rate
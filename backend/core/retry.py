@@ -2,8 +2,10 @@ from tenacity import (
     retry,
     stop_after_attempt,
     wait_exponential,
+    wait_random_exponential,
     retry_if_exception_type,
-    retry_if_not_exception_type
+    retry_if_not_exception_type,
+    retry_if_result
 )
 import httpx
 from datetime import datetime, timedelta
@@ -69,3 +71,13 @@ def retry_on_5xx():
         wait=wait_exponential(multiplier=2, min=2, max=10),
         reraise=True
     )
+
+# Retry decorator for queries that swallow errors and return None
+# (jittered backoff so concurrent callers don't retry in lockstep)
+def retry_on_none(attempts: int = 3):
+    return retry(
+        retry=retry_if_result(lambda result: result is None),
+        stop=stop_after_attempt(attempts),
+        wait=wait_random_exponential(multiplier=0.5, max=4),
+        retry_error_callback=lambda retry_state: None
+    )
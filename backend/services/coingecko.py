@@ -1,3 +1,4 @@
+import asyncio
 import httpx
 from typing import Optional
 import logging
@@ -11,6 +12,9 @@ logger = logging.getLogger(__name__)
 # Pro keys use: pro-api.coingecko.com
 COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
 
+# Max /coins/{id}/history requests in flight per batch (free tier rate limits)
+HISTORICAL_PRICE_CONCURRENCY = 3
+
 # Token address to CoinGecko ID mapping
 TOKEN_MAPPING = {
     # Ethereum Mainnet
@@ -53,6 +57,8 @@ class CoinGeckoService:
             timeout=30.0
         )
         self._price_cache: dict[str, float] = {}
+        # (coingecko_id, from, to) -> in-flight market_chart fetch, shared by concurrent callers
+        self._series_inflight: dict[tuple[str, int, int], asyncio.Task] = {}
 
     async def close(self):
         await self.client.aclose()
@@ -162,14 +168,37 @@ class CoinGeckoService:
         """
         Get historical prices for multiple tokens at once
 
+        Addresses are deduplicated down to CoinGecko IDs (WETH on Ethereum and
+        Arbitrum share one lookup) and the remaining lookups run concurrently,
+        at most HISTORICAL_PRICE_CONCURRENCY at a time.
+
         Returns:
             Dict mapping token address to price
         """
+        # Same token can appear several times (e.g. in sends and receives)
+        addresses_by_id: dict[str, list[str]] = {}
+        for address in dict.fromkeys(a.lower() for a in token_addresses):
+            coingecko_id = self._get_coingecko_id(address)
+            if coingecko_id:
+                addresses_by_id.setdefault(coingecko_id, []).append(address)
+            else:
+                logger.warning(f"No CoinGecko ID mapping for token: {address}")
+
+        semaphore = asyncio.Semaphore(HISTORICAL_PRICE_CONCURRENCY)
+
+        async def fetch(address: str) -> Optional[float]:
+            async with semaphore:
+                return await self.get_historical_price(address, timestamp)
+
+        prices = await asyncio.gather(*(
+            fetch(addresses[0]) for addresses in addresses_by_id.values()
+        ))
+
         results = {}
-        for address in token_addresses:
-            price = await self.get_historical_price(address, timestamp)
+        for addresses, price in zip(addresses_by_id.values(), prices):
             if price:
-                results[address.lower()] = price
+                for address in addresses:
+                    results[address] = price
         return results
 
     async def get_price_time_series(
@@ -199,6 +228,27 @@ class CoinGeckoService:
             logger.warning(f"No CoinGecko ID mapping for symbol: {symbol}")
             return []
 
+        # Identical concurrent requests (e.g. WETH and ETH, or two dashboard
+        # loads on a shared service) collapse into one upstream call
+        key = (coingecko_id, from_timestamp, to_timestamp)
+        task = self._series_inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._fetch_price_time_series(symbol, coingecko_id, from_timestamp, to_timestamp)
+            )
+            self._series_inflight[key] = task
+            task.add_done_callback(lambda _: self._series_inflight.pop(key, None))
+        # Callers get their own list; a cancelled caller doesn't cancel the shared fetch
+        return list(await asyncio.shield(task))
+
+    async def _fetch_price_time_series(
+        self,
+        symbol: str,
+        coingecko_id: str,
+        from_timestamp: int,
+        to_timestamp: int
+    ) -> list[dict]:
+        """Uncached market_chart/range fetch behind get_price_time_series."""
         try:
             response = await self.client.get(
                 f"/coins/{coingecko_id}/market_chart/range",
@@ -248,9 +298,11 @@ class CoinGeckoService:
         Returns:
             List of {timestamp, price1, price2, ratio} dicts
         """
-        # Fetch both price series
-        prices1 = await self.get_price_time_series(symbol1, from_timestamp, to_timestamp)
-        prices2 = await self.get_price_time_series(symbol2, from_timestamp, to_timestamp)
+        # Fetch both price series concurrently
+        prices1, prices2 = await asyncio.gather(
+            self.get_price_time_series(symbol1, from_timestamp, to_timestamp),
+            self.get_price_time_series(symbol2, from_timestamp, to_timestamp)
+        )
 
         if not prices1 or not prices2:
             return []
@@ -1,3 +1,4 @@
+import asyncio
 import httpx
 from typing import Any, Optional
 import logging
@@ -13,6 +14,15 @@ logger = logging.getLogger(__name__)
 
 DEBANK_BASE_URL = "https://pro-openapi.debank.com/v1"
 
+
+def _is_lp_item(portfolio_item: dict[str, Any]) -> bool:
+    return "supply_token_list" in portfolio_item.get("detail", {})
+
+
+def _is_perp_item(portfolio_item: dict[str, Any]) -> bool:
+    return "perpetuals" in portfolio_item.get("detail_types", [])
+
+
 class DeBankService:
     def __init__(self, cache: Optional[CacheService] = None):
         self.client = httpx.AsyncClient(  # ASYNC CLIENT
@@ -23,6 +33,11 @@ class DeBankService:
         )
         self.cache = cache
         self.circuit_breaker = CircuitBreaker(failure_threshold=3, timeout_seconds=60)
+        # protocol_id -> (portfolio item filter, parser)
+        self._protocol_handlers = {
+            "uniswap3": (_is_lp_item, self._parse_uniswap_position),
+            "arb_gmx2": (_is_perp_item, self._parse_gmx_perpetual),
+        }
 
     async def close(self):
         """Close HTTP client"""
@@ -124,35 +139,32 @@ class DeBankService:
         protocol_count = len(data)
         logger.debug(f"DeBank returned {protocol_count} protocols for {address[:10]}...")
 
+        # Parsing is pure Python; keep it off the event loop for large wallets
+        all_positions = await asyncio.to_thread(self._parse_protocols, data, address)
+
+        logger.debug(f"Found {len(all_positions)} positions for {address[:10]}...")
+        return all_positions
+
+    def _parse_protocols(self, data: list[Any], address: str) -> list[dict[str, Any]]:
+        """Parse supported positions out of all_complex_protocol_list"""
         all_positions = []
 
         for protocol in data:
             if not isinstance(protocol, dict):
                 continue
 
-            protocol_id = protocol.get("id", "")
-
-            # Handle Uniswap v3 LP positions
-            if protocol_id == "uniswap3":
-                portfolio_items = protocol.get("portfolio_item_list", [])
-                for portfolio_item in portfolio_items:
-                    detail = portfolio_item.get("detail", {})
-                    if "supply_token_list" in detail:
-                        position = self._parse_uniswap_position(portfolio_item, address)
-                        if position:
-                            all_positions.append(position)
-
-            # Handle GMX V2 perpetuals
-            elif protocol_id == "arb_gmx2":
-                portfolio_items = protocol.get("portfolio_item_list", [])
-                for portfolio_item in portfolio_items:
-                    detail_types = portfolio_item.get("detail_types", [])
-                    if "perpetuals" in detail_types:
-                        position = self._parse_gmx_perpetual(portfolio_item, address)
-                        if position:
-                            all_positions.append(position)
+            # Dispatch on protocol id: Uniswap v3 LPs, GMX V2 perpetuals
+            handler = self._protocol_handlers.get(protocol.get("id", ""))
+            if handler is None:
+                continue
+
+            accepts, parse = handler
+            for portfolio_item in protocol.get("portfolio_item_list", []):
+                if accepts(portfolio_item):
+                    position = parse(portfolio_item, address)
+                    if position:
+                        all_positions.append(position)
 
-        logger.debug(f"Found {len(all_positions)} positions for {address[:10]}...")
         return all_positions
 
     def _parse_uniswap_position(self, portfolio_item: dict[str, Any], wallet: str) -> Optional[dict[str, Any]]:
@@ -15,11 +15,15 @@ Key improvements:
 - Proper pagination to fetch complete history
 """
 
+import asyncio
+import heapq
 import httpx
 import logging
+from itertools import takewhile
 from typing import Any, Optional
 from datetime import datetime
 
+from backend.core.cache import CacheService
 from backend.core.config import settings
 from backend.services.transaction_cache import get_cache, TransactionCache
 
@@ -27,6 +31,23 @@ logger = logging.getLogger(__name__)
 
 DEBANK_BASE_URL = "https://pro-openapi.debank.com/v1"
 
+# Max chains paged concurrently during a full (uncached) fetch
+CHAIN_FETCH_CONCURRENCY = 8
+
+
+class PageBudget:
+    """Page allowance shared by concurrent history streams (one event loop)"""
+    
+    def __init__(self, pages: int):
+        self.remaining = pages
+    
+    def take(self) -> bool:
+        """Claim one page; False once the budget is spent"""
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
 # Chain display names (will be dynamically updated from API)
 DEFAULT_CHAIN_NAMES = {
     "eth": "Ethereum",
@@ -54,8 +75,16 @@ class TransactionDiscoveryService:
     Returns DeBank's native format for maximum flexibility.
     """
     
-    def __init__(self):
-        self.client = httpx.AsyncClient(
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        response_cache: Optional[CacheService] = None
+    ):
+        # A client passed in (e.g. DeBankService's) is shared, not owned
+        self._owns_client = client is None
+        # Redis cache for assembled endpoint responses (not owned either)
+        self.response_cache = response_cache
+        self.client = client or httpx.AsyncClient(
             base_url=DEBANK_BASE_URL,
             headers={"AccessKey": settings.debank_access_key},
             timeout=30.0
@@ -63,7 +92,8 @@ class TransactionDiscoveryService:
         self.chain_names = DEFAULT_CHAIN_NAMES.copy()
     
     async def close(self):
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
     
     async def get_used_chains(self, wallet_address: str) -> list[dict[str, Any]]:
         """
@@ -109,11 +139,13 @@ class TransactionDiscoveryService:
             since: Only include transactions after this time
             until: Only include transactions before this time
             page_count: Items per page (max 20)
-            max_pages: Max pages to fetch total
+            max_pages: Max pages to fetch total (shared across chain streams)
             force_refresh: If True, clear cache and refetch everything
             
         Returns:
-            Dict with transactions, metadata, and cache info
+            Dict with transactions, metadata, and cache info.
+            project_index maps each raw project_id (None when missing) to
+            the positions of its transactions, in order.
         """
         wallet = wallet_address.lower()
         cache = get_cache(wallet)
@@ -176,10 +208,16 @@ class TransactionDiscoveryService:
             # Full fetch (no cache or force refresh)
             logger.info(f"Full fetch for {wallet[:10]}... (no cache)")
             
-            result = await self._fetch_all_history(
-                wallet, chains_to_query, since_ts, until_ts,
-                page_count, max_pages
-            )
+            if len(chains_to_query) > 1:
+                result = await self._fetch_history_by_chain(
+                    wallet, chains_to_query, since_ts, until_ts,
+                    page_count, max_pages
+                )
+            else:
+                result = await self._fetch_all_history(
+                    wallet, chains_to_query, since_ts, until_ts,
+                    page_count, max_pages
+                )
             
             # Save everything to cache
             cache.save_transactions(result["transactions"])
@@ -200,8 +238,9 @@ class TransactionDiscoveryService:
                 if tx.get("chain") in chains
             ]
         
-        # Build summary
-        summary = self._build_summary(all_transactions)
+        # Build summary (and the project_id -> positions index in the same pass)
+        project_index: dict[Optional[str], list[int]] = {}
+        summary = self._build_summary(all_transactions, project_index)
         cache_stats = cache.get_cache_stats()
         
         return {
@@ -212,6 +251,7 @@ class TransactionDiscoveryService:
             "chains_with_data": list(summary["byChain"].keys()),
             "chain_names": self.chain_names,
             "summary": summary,
+            "project_index": project_index,
             "cache": {
                 "status": cache_status,
                 "new_transactions": new_tx_count,
@@ -221,7 +261,7 @@ class TransactionDiscoveryService:
             }
         }
 
-    async def _fetch_all_history(
+    async def _fetch_history_by_chain(
         self,
         wallet: str,
         chains: list[str],
@@ -229,17 +269,104 @@ class TransactionDiscoveryService:
         until_ts: Optional[int],
         page_count: int,
         max_pages: int
+    ) -> dict[str, Any]:
+        """
+        Fetch history with one paginated all_history_list stream per chain.
+        
+        all_history_list pages with a time cursor, so a single cross-chain
+        stream is fetched strictly page by page. Streams for separate chains
+        are independent and run concurrently (bounded by
+        CHAIN_FETCH_CONCURRENCY), then merge back into one newest-first list.
+        Used for full fetches only; incremental syncs are usually one page.
+        
+        The cross-chain stream's first page is fetched first: if that already
+        covers the whole window (small wallets) it is the result, costing one
+        call. Otherwise the per-chain streams continue from where that page
+        ended, drawing from one shared budget of the remaining max_pages - 1
+        pages, so the DeBank call count stays within max_pages either way.
+        
+        Streams cut short by the budget stop at different depths. The merged
+        list is then cut at the newest point any stream stopped, so it stays
+        a newest-first prefix of the history (what the cache expects; later
+        syncs only fetch newer rows and would never fill a gap).
+        """
+        first = await self._fetch_all_history(
+            wallet, chains, since_ts, until_ts, page_count, max_pages=1
+        )
+        seed_start = first["next_start_time"]
+        if first["exhausted"] or max_pages <= 1 or seed_start is None:
+            return first
+        
+        semaphore = asyncio.Semaphore(CHAIN_FETCH_CONCURRENCY)
+        budget = PageBudget(max_pages - 1)
+        
+        async def fetch_chain(chain: str) -> dict[str, Any]:
+            async with semaphore:
+                return await self._fetch_all_history(
+                    wallet, [chain], since_ts, seed_start, page_count, max_pages,
+                    budget=budget
+                )
+        
+        results = await asyncio.gather(*(fetch_chain(c) for c in chains))
+        
+        token_dict = dict(first["token_dict"])
+        project_dict = dict(first["project_dict"])
+        for result in results:
+            token_dict.update(result["token_dict"])
+            project_dict.update(result["project_dict"])
+        
+        # Each stream is already newest first, and the chain streams all
+        # start below the seed page
+        transactions = list(heapq.merge(
+            first["transactions"],
+            *(result["transactions"] for result in results),
+            key=lambda tx: tx.get("time_at") or 0,
+            reverse=True
+        ))
+        
+        cutoff = None
+        truncated = [result["next_start_time"] for result in results if not result["exhausted"]]
+        if truncated:
+            cutoff = max(truncated)
+            transactions = list(takewhile(lambda tx: (tx.get("time_at") or 0) >= cutoff, transactions))
+            logger.info(f"Page budget spent; history cut at {cutoff} ({len(transactions)} txs kept)")
+        
+        return {
+            "transactions": transactions,
+            "token_dict": token_dict,
+            "project_dict": project_dict,
+            "exhausted": cutoff is None,
+            "next_start_time": cutoff
+        }
+
+    async def _fetch_all_history(
+        self,
+        wallet: str,
+        chains: list[str],
+        since_ts: Optional[int],
+        until_ts: Optional[int],
+        page_count: int,
+        max_pages: int,
+        budget: Optional[PageBudget] = None
     ) -> dict[str, Any]:
         """
         Fetch transaction history across all chains using all_history_list endpoint.
         This is more efficient than querying each chain separately.
+        
+        Each page also draws from budget when one is given. "exhausted" in
+        the result is True when paging stopped because the window was fully
+        covered (or on an API error), not because a page limit was hit;
+        "next_start_time" is the start_time the next page would use.
         """
         all_transactions = []
         token_dict = {}
         project_dict = {}
         start_time = until_ts  # Start from most recent, paginate backwards
+        exhausted = False
         
         for page in range(max_pages):
+            if budget is not None and not budget.take():
+                break
             params = {
                 "id": wallet,
                 "page_count": min(page_count, 20)  # DeBank max is 20
@@ -267,6 +394,7 @@ class TransactionDiscoveryService:
                 history = data.get("history_list", [])
                 if not history:
                     logger.info(f"No more transactions after page {page}")
+                    exhausted = True
                     break
                 
                 # Process transactions
@@ -279,7 +407,9 @@ class TransactionDiscoveryService:
                         return {
                             "transactions": all_transactions,
                             "token_dict": token_dict,
-                            "project_dict": project_dict
+                            "project_dict": project_dict,
+                            "exhausted": True,
+                            "next_start_time": start_time
                         }
                     
                     # Skip scam transactions
@@ -300,12 +430,15 @@ class TransactionDiscoveryService:
                 # If we got fewer than requested, we've reached the end
                 if len(history) < page_count:
                     logger.info(f"Reached end of history at page {page} ({len(history)} < {page_count})")
+                    exhausted = True
                     break
                 
                 logger.info(f"Page {page}: got {len(history)} txs, total now {len(all_transactions)}")
                     
             except Exception as e:
                 logger.error(f"Error fetching all_history_list page {page}: {e}")
+                # Don't fan out more calls after an API error
+                exhausted = True
                 break
         
         logger.info(f"Fetched total {len(all_transactions)} transactions across {len(set(tx.get('chain') for tx in all_transactions))} chains")
@@ -313,23 +446,41 @@ class TransactionDiscoveryService:
         return {
             "transactions": all_transactions,
             "token_dict": token_dict,
-            "project_dict": project_dict
+            "project_dict": project_dict,
+            "exhausted": exhausted,
+            "next_start_time": start_time
         }
 
-    def _build_summary(self, transactions: list[dict]) -> dict[str, Any]:
-        """Build summary statistics from transactions"""
+    def _build_summary(
+        self,
+        transactions: list[dict],
+        project_index: Optional[dict[Optional[str], list[int]]] = None
+    ) -> dict[str, Any]:
+        """
+        Build summary statistics from transactions
+        
+        If project_index is given, it's filled with project_id -> list of
+        transaction positions while counting.
+        """
         by_chain = {}
         by_project = {}
         by_category = {}
         
-        for tx in transactions:
+        for i, tx in enumerate(transactions):
             # Count by chain
             chain = tx.get("chain", "unknown")
             by_chain[chain] = by_chain.get(chain, 0) + 1
             
             # Count by project
-            project = tx.get("project_id") or "other"
+            project_id = tx.get("project_id")
+            project = project_id or "other"
             by_project[project] = by_project.get(project, 0) + 1
+            if project_index is not None:
+                positions = project_index.get(project_id)
+                if positions is None:
+                    project_index[project_id] = [i]
+                else:
+                    positions.append(i)
             
             # Count by category
             category = tx.get("cate_id") or tx.get("tx", {}).get("name", "unknown")
@@ -351,7 +502,13 @@ async def get_discovery_service() -> TransactionDiscoveryService:
     """Dependency injection for TransactionDiscoveryService"""
     global _discovery_service
     if _discovery_service is None:
-        _discovery_service = TransactionDiscoveryService()
+        # Reuse DeBankService's connection pool (same host and AccessKey)
+        # and its Redis connection
+        from backend.services.debank import get_debank_service
+        debank = await get_debank_service()
+        _discovery_service = TransactionDiscoveryService(
+            client=debank.client, response_cache=debank.cache
+        )
     return _discovery_service
 
 
@@ -13,6 +13,9 @@ import httpx
 from typing import Any, Optional
 from datetime import datetime
 import logging
+from operator import itemgetter
+
+from backend.core.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +60,10 @@ MARKET_INFO = {
     "0xfaeae570b07618d3f10360608e43c241181c4614": {"name": "NEAR/USD", "index_token": "NEAR", "decimals": 24},
 }
 
+# Health probe: short timeout, result reused across requests for a while
+META_PROBE_TIMEOUT_SECONDS = 2.0
+META_PROBE_TTL_SECONDS = 30
+
 # GMX V2 precision constants
 # GMX stores USD values with 30 decimal precision
 GMX_USD_PRECISION = 10**30
@@ -70,6 +77,7 @@ class GMXSubgraphService:
     def __init__(self):
         self.url = GMX_SUBGRAPH_URL
         self._client: Optional[httpx.AsyncClient] = None
+        self._meta_cache = TTLCache(ttl_seconds=META_PROBE_TTL_SECONDS, max_entries=1)
     
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None or self._client.is_closed:
@@ -96,6 +104,34 @@ class GMXSubgraphService:
             logger.error(f"GMX Subgraph query failed: {e}")
             return None
     
+    async def meta_is_fresh(self) -> bool:
+        """
+        Cheap health probe before the heavier position queries.
+
+        Subsquid doesn't expose The Graph's _meta block, so this checks that
+        squidStatus answers with a processed height within a short timeout.
+        The result is cached for META_PROBE_TTL_SECONDS.
+        """
+        cached = self._meta_cache.get("fresh")
+        if cached is not None:
+            return cached
+
+        fresh = False
+        try:
+            client = await self._get_client()
+            response = await client.post(
+                self.url,
+                json={"query": "{ squidStatus { height } }"},
+                timeout=META_PROBE_TIMEOUT_SECONDS
+            )
+            data = response.json()
+            fresh = bool(((data.get("data") or {}).get("squidStatus") or {}).get("height"))
+        except Exception as e:
+            logger.warning(f"GMX Subgraph health probe failed: {e}")
+
+        self._meta_cache.set("fresh", fresh)
+        return fresh
+
     def _safe_int(self, val, default: int = 0) -> int:
         """Safely convert value to int."""
         if val is None:
@@ -222,7 +258,7 @@ class GMXSubgraphService:
             last_timestamp = max(timestamps) if timestamps else 0
 
             # Get current size from the most recent event
-            all_sorted = sorted(all_trades, key=lambda x: x["timestamp"])
+            all_sorted = sorted(all_trades, key=itemgetter("timestamp"))
             current_size = all_sorted[-1]["size_after_usd"] if all_sorted else 0
 
             # Calculate total P&L from decreases
@@ -358,7 +394,7 @@ class GMXSubgraphService:
             })
 
         # Sort by timestamp, newest first
-        trades.sort(key=lambda x: x["timestamp"], reverse=True)
+        trades.sort(key=itemgetter("timestamp"), reverse=True)
 
         return trades
 
@@ -540,7 +576,7 @@ class GMXSubgraphService:
             })
 
         # Sort by timestamp
-        transactions.sort(key=lambda x: x["timestamp"])
+        transactions.sort(key=itemgetter("timestamp"))
 
         # Calculate summary
         total_size_opened = sum(tx["size_delta_usd"] for tx in transactions if tx["action"] in ("Open", "Increase"))
@@ -914,7 +950,7 @@ class GMXSubgraphService:
             })
         
         # Sort by timestamp
-        all_events.sort(key=lambda x: x["timestamp"])
+        all_events.sort(key=itemgetter("timestamp"))
         
         # Find the last time position was closed (size_after == 0 on decrease)
         last_close_idx = -1
@@ -1175,3 +1211,21 @@ class GMXSubgraphService:
             })
         
         return full_positions
+
+
+# Global service instance (shared so the HTTP connection pool survives across requests)
+_gmx_subgraph_service: Optional[GMXSubgraphService] = None
+
+
+async def get_gmx_subgraph_service() -> GMXSubgraphService:
+    global _gmx_subgraph_service
+    if _gmx_subgraph_service is None:
+        _gmx_subgraph_service = GMXSubgraphService()
+    return _gmx_subgraph_service
+
+
+async def close_gmx_subgraph_service():
+    global _gmx_subgraph_service
+    if _gmx_subgraph_service:
+        await _gmx_subgraph_service.close()
+        _gmx_subgraph_service = None
@@ -2,18 +2,113 @@
 The Graph service for Uniswap V3 pool data
 Replaces DeBank for LP position details - real-time, accurate data
 """
+import asyncio
 import httpx
 import math
+import time
 from typing import Optional, Any
 from decimal import Decimal
 import logging
 
+from backend.core.cache import TTLCache
+from backend.core.config import settings
+from backend.core.retry import retry_on_none
+
 logger = logging.getLogger(__name__)
 
 # Uniswap V3 math constants
 Q96 = 2 ** 96
 Q192 = 2 ** 192
 
+# Bound for the per-service block price memo (the service is long-lived);
+# oldest entries are evicted first
+BLOCK_PRICE_CACHE_SIZE = 10_000
+# Prices at a past block never change, so entries only expire to recycle memory
+BLOCK_PRICE_CACHE_TTL_SECONDS = 24 * 3600
+
+# Max subgraph queries in flight per service, across all requests
+# (The Graph gateway rate limits)
+SUBGRAPH_CONCURRENCY = 10
+
+# Health probe: short timeout, result reused across requests for a while
+META_PROBE_TIMEOUT_SECONDS = 2.0
+META_PROBE_TTL_SECONDS = 30
+# Treat the indexer as lagging once its head block is this old
+META_MAX_LAG_SECONDS = 600
+
+# Max positions fetched per aliased bundle query
+POSITION_BUNDLE_BATCH_SIZE = 50
+
+# Max positions post-processed at once in get_positions_bundle (each fans out
+# into mint and block price queries, which still share SUBGRAPH_CONCURRENCY)
+POSITION_BUILD_CONCURRENCY = 8
+
+# Position fields shared by get_position_data and get_positions_bundle
+POSITION_FIELDS = """
+            id
+            owner
+            liquidity
+            tickLower {
+              tickIdx
+            }
+            tickUpper {
+              tickIdx
+            }
+            depositedToken0
+            depositedToken1
+            withdrawnToken0
+            withdrawnToken1
+            collectedFeesToken0
+            collectedFeesToken1
+            feeGrowthInside0LastX128
+            feeGrowthInside1LastX128
+            pool {
+              id
+              feeTier
+              sqrtPrice
+              tick
+              liquidity
+              feeGrowthGlobal0X128
+              feeGrowthGlobal1X128
+              token0 {
+                id
+                symbol
+                decimals
+                derivedETH
+              }
+              token1 {
+                id
+                symbol
+                decimals
+                derivedETH
+              }
+              token0Price
+              token1Price
+            }
+            transaction {
+              id
+              timestamp
+              blockNumber
+            }
+"""
+
+# Snapshot fields used to rebuild a position's transaction history
+SNAPSHOT_FIELDS = """
+            id
+            timestamp
+            blockNumber
+            transaction {
+              id
+            }
+            liquidity
+            depositedToken0
+            depositedToken1
+            withdrawnToken0
+            withdrawnToken1
+            collectedFeesToken0
+            collectedFeesToken1
+"""
+
 
 class TheGraphService:
     """Service to fetch Uniswap V3 data from The Graph"""
@@ -23,18 +118,27 @@ class TheGraphService:
         # Uniswap V3 Ethereum subgraph
         self.subgraph_url = f"https://gateway.thegraph.com/api/{api_key}/subgraphs/id/5zvR82QoaXYFyDEKLZ9t6v9adgnptxYpKpSbxtgVENFV"
         self.client = httpx.AsyncClient(timeout=30.0)
+        # Prices at a past block never change: (token0, token1, block) -> prices
+        self._block_price_cache = TTLCache(
+            ttl_seconds=BLOCK_PRICE_CACHE_TTL_SECONDS, max_entries=BLOCK_PRICE_CACHE_SIZE
+        )
+        self._meta_cache = TTLCache(ttl_seconds=META_PROBE_TTL_SECONDS, max_entries=1)
+        # Every _query acquires this, so nested fan-outs can't multiply the
+        # number of requests in flight against the gateway
+        self._query_semaphore = asyncio.Semaphore(SUBGRAPH_CONCURRENCY)
     
     async def close(self):
         """Close HTTP client"""
         await self.client.aclose()
 
     async def _query(self, query: str) -> Optional[dict]:
-        """Execute a GraphQL query"""
+        """Execute a GraphQL query (at most SUBGRAPH_CONCURRENCY in flight)"""
         try:
-            response = await self.client.post(
-                self.subgraph_url,
-                json={"query": query}
-            )
+            async with self._query_semaphore:
+                response = await self.client.post(
+                    self.subgraph_url,
+                    json={"query": query}
+                )
             if response.status_code != 200:
                 logger.error(f"Subgraph query failed: {response.status_code}")
                 return None
@@ -43,6 +147,39 @@ class TheGraphService:
             logger.error(f"Subgraph query error: {e}")
             return None
 
+    async def meta_is_fresh(self, max_lag_seconds: int = META_MAX_LAG_SECONDS) -> bool:
+        """
+        Cheap _meta probe: False if the indexer reports errors, its head block
+        is older than max_lag_seconds, or it doesn't answer within
+        META_PROBE_TIMEOUT_SECONDS. The result is cached for META_PROBE_TTL_SECONDS.
+        """
+        cached = self._meta_cache.get(max_lag_seconds)
+        if cached is not None:
+            return cached
+
+        fresh = False
+        try:
+            response = await self.client.post(
+                self.subgraph_url,
+                json={"query": "{ _meta { block { number timestamp } hasIndexingErrors } }"},
+                timeout=META_PROBE_TIMEOUT_SECONDS
+            )
+            meta = ((response.json().get("data") or {}).get("_meta")) or {}
+            block_timestamp = int((meta.get("block") or {}).get("timestamp") or 0)
+            fresh = (
+                not meta.get("hasIndexingErrors", True)
+                and time.time() - block_timestamp <= max_lag_seconds
+            )
+        except Exception as e:
+            logger.warning(f"Subgraph health probe failed: {e}")
+
+        self._meta_cache.set(max_lag_seconds, fresh)
+        return fresh
+
+    @retry_on_none()
+    async def _query_with_retry(self, query: str) -> Optional[dict]:
+        """_query, retried with jittered backoff while it fails (returns None)"""
+        return await self._query(query)
 
     async def get_eth_price_usd(self) -> float:
         """Get current ETH price in USD from Uniswap pools"""
@@ -124,7 +261,8 @@ class TheGraphService:
     async def get_position_history(
         self,
         position_id: str,
-        debank_txs: Optional[dict[str, dict]] = None
+        debank_txs: Optional[dict[str, dict]] = None,
+        structure: Optional[tuple[dict, list[dict]]] = None
     ) -> Optional[dict[str, Any]]:
         """
         Get complete transaction history for a position with USD values.
@@ -140,11 +278,29 @@ class TheGraphService:
             debank_txs: Dict mapping tx_hash -> DeBank tx data for token amounts.
                        Required for accurate amounts. Without it, falls back to subgraph
                        (which has bugs for fee data).
+            structure: (position, snapshots) from get_position_structure, when the
+                       caller already fetched it (e.g. concurrently with DeBank).
 
         Returns:
             Dict with position info, pool info, and transactions list
         """
-        # STAGE 1: Get position structure from Subgraph
+        if structure is None:
+            structure = await self.get_position_structure(position_id)
+            if structure is None:
+                return None
+
+        position, snapshots = structure
+        return await self._build_position_history(position_id, position, snapshots, debank_txs)
+
+    async def get_position_structure(self, position_id: str) -> Optional[tuple[dict, list[dict]]]:
+        """
+        Stage 1 of get_position_history: the position and its snapshots.
+
+        Needs no DeBank data, so callers can run it alongside the DeBank fetch.
+
+        Returns:
+            (position, snapshots), or None if the position doesn't exist
+        """
         query = """
         {
           position(id: "%s") {
@@ -191,14 +347,29 @@ class TheGraphService:
             logger.warning(f"Position {position_id} not found")
             return None
 
-        position = data["data"]["position"]
-        snapshots = data["data"].get("positionSnapshots", [])
+        return data["data"]["position"], data["data"].get("positionSnapshots", [])
+
+    async def _build_position_history(
+        self,
+        position_id: str,
+        position: dict,
+        snapshots: list[dict],
+        debank_txs: Optional[dict[str, dict]] = None
+    ) -> dict[str, Any]:
+        """Turn a position and its snapshots into the get_position_history result."""
         pool = position.get("pool", {})
         token0 = pool.get("token0", {})
         token1 = pool.get("token1", {})
         token0_addr = token0.get("id", "").lower()
         token1_addr = token1.get("id", "").lower()
 
+        # Fetch historical prices for every snapshot block up front (concurrently)
+        block_prices = await self._get_token_prices_at_blocks(
+            token0.get("id", ""),
+            token1.get("id", ""),
+            {int(snap.get("blockNumber", 0)) for snap in snapshots}
+        )
+
         # Process snapshots into transactions
         transactions = []
         prev_snapshot = None
@@ -285,12 +456,8 @@ class TheGraphService:
                     amount0 = float(snap.get("depositedToken0", 0))
                     amount1 = float(snap.get("depositedToken1", 0))
 
-            # STAGE 3: Get historical prices from Subgraph
-            prices = await self._get_token_prices_at_block(
-                token0.get("id", ""),
-                token1.get("id", ""),
-                block_number
-            )
+            # STAGE 3: Historical prices from Subgraph (prefetched above)
+            prices = block_prices.get(block_number)
 
             # STAGE 4: Compute USD values
             if prices:
@@ -408,55 +575,9 @@ class TheGraphService:
         """
         query = """
         {
-          position(id: "%s") {
-            id
-            owner
-            liquidity
-            tickLower {
-              tickIdx
-            }
-            tickUpper {
-              tickIdx
-            }
-            depositedToken0
-            depositedToken1
-            withdrawnToken0
-            withdrawnToken1
-            collectedFeesToken0
-            collectedFeesToken1
-            feeGrowthInside0LastX128
-            feeGrowthInside1LastX128
-            pool {
-              id
-              feeTier
-              sqrtPrice
-              tick
-              liquidity
-              feeGrowthGlobal0X128
-              feeGrowthGlobal1X128
-              token0 {
-                id
-                symbol
-                decimals
-                derivedETH
-              }
-              token1 {
-                id
-                symbol
-                decimals
-                derivedETH
-              }
-              token0Price
-              token1Price
-            }
-            transaction {
-              id
-              timestamp
-              blockNumber
-            }
-          }
+          position(id: "%s") {%s          }
         }
-        """ % position_id
+        """ % (position_id, POSITION_FIELDS)
         
         data = await self._query(query)
         if not data:
@@ -522,6 +643,15 @@ class TheGraphService:
         # Get ETH price for USD conversion
         eth_price_usd = await self.get_eth_price_usd()
         
+        return self._build_full_position(position_id, position, eth_price_usd)
+
+    def _build_full_position(
+        self,
+        position_id: str,
+        position: dict,
+        eth_price_usd: float
+    ) -> dict[str, Any]:
+        """Calculate token amounts and USD values for a raw subgraph position."""
         pool = position.get("pool", {})
         token0 = pool.get("token0", {})
         token1 = pool.get("token1", {})
@@ -635,8 +765,16 @@ class TheGraphService:
         if not position:
             return {"mints": [], "burns": [], "collects": [], "summary": {}}
         
-        # Extract aggregated transaction data from position entity
-        summary = {
+        return {
+            "mints": [],  # Individual transactions not available via position filter
+            "burns": [],
+            "collects": [],
+            "summary": self._position_transaction_summary(position)
+        }
+
+    def _position_transaction_summary(self, position: dict) -> dict[str, Any]:
+        """Extract aggregated transaction data from a position entity."""
+        return {
             "deposited_token0": float(position.get("depositedToken0", 0)),
             "deposited_token1": float(position.get("depositedToken1", 0)),
             "withdrawn_token0": float(position.get("withdrawnToken0", 0)),
@@ -646,13 +784,6 @@ class TheGraphService:
             "mint_timestamp": int(position.get("transaction", {}).get("timestamp", 0)),
             "mint_block": int(position.get("transaction", {}).get("blockNumber", 0))
         }
-        
-        return {
-            "mints": [],  # Individual transactions not available via position filter
-            "burns": [],
-            "collects": [],
-            "summary": summary
-        }
 
     async def get_historical_token_price(
         self, 
@@ -777,6 +908,18 @@ class TheGraphService:
         token1_total = 0.0
         mint_details = []
         
+        # Fetch prices for every relevant mint block up front (concurrently)
+        block_prices = {}
+        if token0_address and token1_address:
+            block_prices = await self._get_token_prices_at_blocks(
+                token0_address,
+                token1_address,
+                {
+                    block for mint in mints
+                    if (block := int(mint.get("transaction", {}).get("blockNumber", 0))) >= min_block
+                }
+            )
+        
         for mint in mints:
             block = int(mint.get("transaction", {}).get("blockNumber", 0))
             if min_block > 0 and block < min_block:
@@ -793,9 +936,7 @@ class TheGraphService:
             token1_value = 0.0
             
             if token0_address and token1_address:
-                prices = await self._get_token_prices_at_block(
-                    token0_address, token1_address, block
-                )
+                prices = block_prices.get(block)
                 if prices:
                     token0_value = amount0 * prices["token0_price"]
                     token1_value = amount1 * prices["token1_price"]
@@ -821,6 +962,28 @@ class TheGraphService:
             "mints": mint_details
         }
     
+    async def _get_token_prices_at_blocks(
+        self,
+        token0_address: str,
+        token1_address: str,
+        block_numbers: set[int]
+    ) -> dict[int, Optional[dict[str, float]]]:
+        """
+        Get token prices at many blocks concurrently.
+
+        In-flight queries are bounded by the service-wide _query semaphore
+        (SUBGRAPH_CONCURRENCY shared with every other caller).
+        """
+        blocks = list(block_numbers)
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(self._get_token_prices_at_block(
+                    token0_address, token1_address, block
+                ))
+                for block in blocks
+            ]
+        return {block: task.result() for block, task in zip(blocks, tasks)}
+
     async def _get_token_prices_at_block(
         self,
         token0_address: str,
@@ -828,6 +991,11 @@ class TheGraphService:
         block_number: int
     ) -> Optional[dict[str, float]]:
         """Get token prices in USD at a specific block."""
+        cache_key = (token0_address.lower(), token1_address.lower(), block_number)
+        cached = self._block_price_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         query = """
         {
           bundle(id: "1", block: {number: %d}) {
@@ -855,11 +1023,16 @@ class TheGraphService:
         token0_derived = float(token0_data.get("derivedETH", 0)) if token0_data else 0
         token1_derived = float(token1_data.get("derivedETH", 0)) if token1_data else 0
         
-        return {
+        prices = {
             "token0_price": token0_derived * eth_price,
             "token1_price": token1_derived * eth_price,
             "eth_price": eth_price
         }
+        # Zero prices usually mean a failed or not-yet-indexed lookup; don't
+        # let them stick, the next request retries
+        if prices["eth_price"] and prices["token0_price"] and prices["token1_price"]:
+            self._block_price_cache.set(cache_key, prices)
+        return prices
 
     async def get_position_with_historical_values(
         self, 
@@ -887,6 +1060,15 @@ class TheGraphService:
         transactions = await self.get_position_transactions(position_id)
         summary = transactions.get("summary", {})
         
+        return await self._apply_historical_values(position, summary, owner_address)
+
+    async def _apply_historical_values(
+        self,
+        position: dict[str, Any],
+        summary: dict[str, Any],
+        owner_address: Optional[str] = None
+    ) -> dict[str, Any]:
+        """Fill initial deposit USD values from the owner's mints in the pool."""
         # Get historical USD values from mint transactions
         initial_value0_usd = 0.0
         initial_value1_usd = 0.0
@@ -922,6 +1104,80 @@ class TheGraphService:
         
         return position
 
+    async def get_positions_bundle(
+        self,
+        position_ids: list[str],
+        debank_txs: Optional[dict[str, dict]] = None,
+        owner_address: Optional[str] = None
+    ) -> dict[str, tuple[Optional[dict], Optional[dict]]]:
+        """
+        Batched get_position_with_historical_values + get_position_history.
+
+        Positions and their snapshots are fetched with one aliased GraphQL
+        query per POSITION_BUNDLE_BATCH_SIZE positions (plus the current ETH
+        price), instead of several round-trips per position. Only the
+        per-block price lookups still go out individually.
+
+        Returns:
+            Dict mapping position_id -> (full_position, history); either side
+            is None if the position wasn't found.
+        """
+        raw_positions: dict[str, Optional[dict]] = {}
+        raw_snapshots: dict[str, list[dict]] = {}
+        eth_price_usd = 0.0
+
+        for start in range(0, len(position_ids), POSITION_BUNDLE_BATCH_SIZE):
+            batch = position_ids[start:start + POSITION_BUNDLE_BATCH_SIZE]
+            selections = "".join(
+                """
+          p%d: position(id: "%s") {%s          }
+          s%d: positionSnapshots(where: {position: "%s"}, orderBy: timestamp, orderDirection: asc, first: 1000) {%s          }
+                """ % (i, pid, POSITION_FIELDS, i, pid, SNAPSHOT_FIELDS)
+                for i, pid in enumerate(batch)
+            )
+            query = """
+        {
+          bundle(id: "1") {
+            ethPriceUSD
+          }%s
+        }
+        """ % selections
+
+            data = await self._query_with_retry(query)
+            result = (data or {}).get("data") or {}
+            bundle = result.get("bundle")
+            if bundle:
+                eth_price_usd = float(bundle.get("ethPriceUSD", 0))
+            for i, pid in enumerate(batch):
+                raw_positions[pid] = result.get(f"p{i}")
+                raw_snapshots[pid] = result.get(f"s{i}") or []
+
+        semaphore = asyncio.Semaphore(POSITION_BUILD_CONCURRENCY)
+
+        async def build(position_id: str) -> tuple[Optional[dict], Optional[dict]]:
+            position = raw_positions.get(position_id)
+            if not position:
+                logger.warning(f"Position {position_id} not found in subgraph")
+                return None, None
+
+            try:
+                async with semaphore:
+                    full_position = await self._apply_historical_values(
+                        self._build_full_position(position_id, position, eth_price_usd),
+                        self._position_transaction_summary(position),
+                        owner_address
+                    )
+                    history = await self._build_position_history(
+                        position_id, position, raw_snapshots[position_id], debank_txs
+                    )
+            except Exception as e:
+                logger.error(f"Error building position {position_id}: {e}", exc_info=True)
+                return None, None
+            return full_position, history
+
+        results = await asyncio.gather(*(build(pid) for pid in position_ids))
+        return dict(zip(position_ids, results))
+
     # Legacy methods for backward compatibility
     async def get_pool_fee_tier(self, pool_address: str) -> Optional[float]:
         """Get the fee tier for a Uniswap V3 pool"""
@@ -995,3 +1251,21 @@ class TheGraphService:
             "total_usd": 0.0,
             "collected_usd": (collected0 * token0_price) + (collected1 * token1_price)
         }
+
+
+# Global service instance (shared so the HTTP connection pool survives across requests)
+_thegraph_service: Optional[TheGraphService] = None
+
+
+async def get_thegraph_service() -> TheGraphService:
+    global _thegraph_service
+    if _thegraph_service is None:
+        _thegraph_service = TheGraphService(settings.thegraph_api_key)
+    return _thegraph_service
+
+
+async def close_thegraph_service():
+    global _thegraph_service
+    if _thegraph_service:
+        await _thegraph_service.close()
+        _thegraph_service = None
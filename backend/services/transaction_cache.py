@@ -15,12 +15,21 @@ from pathlib import Path
 from typing import Any, Optional
 from datetime import datetime
 
+from backend.core.cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
+# Shared read-only fallback for missing sends/receives
+_EMPTY: tuple = ()
+
 # Cache directory
 CACHE_DIR = Path("/app/cache")
 CACHE_DIR.mkdir(exist_ok=True)
 
+# Bound for the in-process TransactionCache instances kept by get_cache
+WALLET_CACHE_MAX_ENTRIES = 256
+WALLET_CACHE_TTL_SECONDS = 3600
+
 
 class TransactionCache:
     """
@@ -251,18 +260,37 @@ class TransactionCache:
             tx_id: Transaction ID
             prices: Dict mapping token_address -> {price_usd, value_usd}
         """
+        self.save_transaction_prices_bulk([(tx_id, prices)])
+    
+    def save_transaction_prices_bulk(
+        self,
+        batch: list[tuple[str, dict[str, dict[str, float]]]]
+    ):
+        """
+        Save prices for many transactions in a single commit.
+        
+        Args:
+            batch: List of (tx_id, {token_address -> {price_usd, value_usd}})
+        """
+        rows = [
+            (
+                tx_id,
+                token_addr.lower(),
+                price_data.get("price_usd"),
+                price_data.get("value_usd")
+            )
+            for tx_id, prices in batch
+            for token_addr, price_data in prices.items()
+        ]
+        if not rows:
+            return
+        
         with sqlite3.connect(self.db_path) as conn:
-            for token_addr, price_data in prices.items():
-                conn.execute("""
-                    INSERT OR REPLACE INTO transaction_prices 
-                    (tx_id, token_address, price_usd, value_usd, fetched_at)
-                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-                """, (
-                    tx_id, 
-                    token_addr.lower(), 
-                    price_data.get("price_usd"),
-                    price_data.get("value_usd")
-                ))
+            conn.executemany("""
+                INSERT OR REPLACE INTO transaction_prices 
+                (tx_id, token_address, price_usd, value_usd, fetched_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """, rows)
             conn.commit()
     
     def get_transaction_prices(self, tx_id: str) -> dict[str, dict[str, float]]:
@@ -324,14 +352,14 @@ class TransactionCache:
                 continue
             
             # Merge prices into sends
-            for token in tx.get("sends", []) or []:
+            for token in tx.get("sends") or _EMPTY:
                 token_addr = token.get("token_id", "").lower()
                 if token_addr in prices:
                     token["price_usd"] = prices[token_addr]["price_usd"]
                     token["value_usd"] = prices[token_addr]["value_usd"]
             
             # Merge prices into receives
-            for token in tx.get("receives", []) or []:
+            for token in tx.get("receives") or _EMPTY:
                 token_addr = token.get("token_id", "").lower()
                 if token_addr in prices:
                     token["price_usd"] = prices[token_addr]["price_usd"]
@@ -563,30 +591,38 @@ class TransactionCache:
     def get_user_position(self, position_id: str) -> Optional[dict[str, Any]]:
         """Get a single user position with its transactions"""
         with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            
-            row = conn.execute(
-                "SELECT * FROM user_positions WHERE id = ?",
-                (position_id,)
-            ).fetchone()
-            
-            if not row:
-                return None
-            
-            position = dict(row)
-            
-            # Get linked transaction IDs
-            tx_rows = conn.execute("""
-                SELECT transaction_id, added_at
-                FROM position_transactions
-                WHERE position_id = ?
-                ORDER BY added_at DESC
-            """, (position_id,)).fetchall()
-            
-            position["transactionIds"] = [r["transaction_id"] for r in tx_rows]
-            position["transactionCount"] = len(tx_rows)
-            
-            return position
+            return self._load_user_position(conn, position_id)
+    
+    def _load_user_position(
+        self,
+        conn: sqlite3.Connection,
+        position_id: str
+    ) -> Optional[dict[str, Any]]:
+        """Read a user position and its transaction IDs on an open connection"""
+        conn.row_factory = sqlite3.Row
+        
+        row = conn.execute(
+            "SELECT * FROM user_positions WHERE id = ?",
+            (position_id,)
+        ).fetchone()
+        
+        if not row:
+            return None
+        
+        position = dict(row)
+        
+        # Get linked transaction IDs
+        tx_rows = conn.execute("""
+            SELECT transaction_id, added_at
+            FROM position_transactions
+            WHERE position_id = ?
+            ORDER BY added_at DESC
+        """, (position_id,)).fetchall()
+        
+        position["transactionIds"] = [r["transaction_id"] for r in tx_rows]
+        position["transactionCount"] = len(tx_rows)
+        
+        return position
     
     def get_all_user_positions(self) -> list[dict[str, Any]]:
         """Get all user-created positions with their transaction IDs"""
@@ -661,8 +697,16 @@ class TransactionCache:
             conn.commit()
             return cursor.rowcount > 0
     
-    def add_transaction_to_position(self, position_id: str, transaction_id: str) -> bool:
-        """Add a transaction to a position"""
+    def add_transaction_to_position(
+        self,
+        position_id: str,
+        transaction_id: str
+    ) -> Optional[dict[str, Any]]:
+        """
+        Add a transaction to a position.
+        
+        Returns the updated position, or None if the write failed.
+        """
         with sqlite3.connect(self.db_path) as conn:
             try:
                 conn.execute("""
@@ -670,19 +714,29 @@ class TransactionCache:
                     VALUES (?, ?)
                 """, (position_id, transaction_id))
                 conn.commit()
-                return True
             except Exception:
-                return False
+                return None
+            return self._load_user_position(conn, position_id)
     
-    def remove_transaction_from_position(self, position_id: str, transaction_id: str) -> bool:
-        """Remove a transaction from a position"""
+    def remove_transaction_from_position(
+        self,
+        position_id: str,
+        transaction_id: str
+    ) -> Optional[dict[str, Any]]:
+        """
+        Remove a transaction from a position.
+        
+        Returns the updated position, or None if the transaction was not linked.
+        """
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.execute("""
                 DELETE FROM position_transactions
                 WHERE position_id = ? AND transaction_id = ?
             """, (position_id, transaction_id))
             conn.commit()
-            return cursor.rowcount > 0
+            if cursor.rowcount == 0:
+                return None
+            return self._load_user_position(conn, position_id)
     
     def get_assigned_transaction_ids(self) -> set:
         """Get all transaction IDs that are assigned to any position"""
@@ -693,6 +747,17 @@ class TransactionCache:
             return {row[0] for row in rows}
 
 
+# Per-wallet cache instances, so schema setup doesn't rerun on every request.
+# Bounded: one entry per distinct wallet would otherwise grow forever in a
+# long-running process (an evicted wallet just re-runs the idempotent setup)
+_caches = TTLCache(ttl_seconds=WALLET_CACHE_TTL_SECONDS, max_entries=WALLET_CACHE_MAX_ENTRIES)
+
+
 def get_cache(wallet_address: str) -> TransactionCache:
     """Get or create cache for a wallet"""
-    return TransactionCache(wallet_address)
+    wallet = wallet_address.lower()
+    cache = _caches.get(wallet)
+    if cache is None:
+        cache = TransactionCache(wallet)
+        _caches.set(wallet, cache)
+    return cache
@@ -0,0 +1,165 @@
+import random
+import statistics
+
+import pytest
+from backend.app.api.v1.build import (
+    StrategyGMXTradeItem,
+    _find_threshold_breaches,
+    _ratio_statistics,
+    aggregate_gmx_trades_to_positions,
+)
+
+
+def _trade(key, action, size, price, ts, pnl=0.0, collateral=0.0, side="Long", market="ETH/USD"):
+    return StrategyGMXTradeItem(
+        tx_hash=f"0x{key}{ts}",
+        position_key=key,
+        market_name=market,
+        side=side,
+        action=action,
+        size_delta_usd=size,
+        collateral_usd=collateral,
+        execution_price=price,
+        pnl_usd=pnl,
+        timestamp=ts,
+    )
+
+
+def _legacy_totals(trades):
+    """Per-trade dict accumulation as done before the grouped rewrite"""
+    positions = {}
+    for trade in trades:
+        pos = positions.setdefault(trade.position_key, {
+            "size": 0.0, "entry_sum": 0.0, "entry_size": 0.0, "pnl": 0.0, "margin": 0.0, "count": 0,
+        })
+        pos["count"] += 1
+        if trade.action in ("Open", "Increase"):
+            pos["size"] += trade.size_delta_usd
+            pos["entry_sum"] += trade.execution_price * trade.size_delta_usd
+            pos["entry_size"] += trade.size_delta_usd
+            if trade.action == "Open" and pos["margin"] == 0:
+                pos["margin"] = trade.collateral_usd
+        elif trade.action in ("Decrease", "Close"):
+            pos["size"] -= trade.size_delta_usd
+            pos["pnl"] += trade.pnl_usd
+    return positions
+
+
+def _sample_trades():
+    return [
+        _trade("a", "Open", 1000.0, 2000.0, 100, collateral=200.0),
+        _trade("a", "Increase", 500.0, 2100.0, 200),
+        _trade("a", "Decrease", 300.0, 2200.0, 300, pnl=25.0),
+        _trade("b", "Open", 800.0, 60000.0, 150, collateral=100.0, side="Short", market="BTC/USD"),
+        _trade("b", "Close", 800.0, 59000.0, 400, pnl=-12.5, side="Short", market="BTC/USD"),
+        _trade("c", "Open", 50.0, 1.5, 120, collateral=0.0),
+        _trade("c", "Open", 50.0, 1.7, 130, collateral=10.0),
+    ]
+
+
+def test_aggregate_matches_legacy_totals():
+    """Grouped reductions give the same totals as the old per-trade loop"""
+    trades = _sample_trades()
+    legacy = _legacy_totals(trades)
+
+    result = {p["position_key"]: p for p in aggregate_gmx_trades_to_positions(trades)}
+
+    assert set(result) == set(legacy)
+    for key, old in legacy.items():
+        pos = result[key]
+        entry_price = old["entry_sum"] / old["entry_size"] if old["entry_size"] > 0 else 0.0
+        assert pos["position_value_usd"] == pytest.approx(old["size"])
+        assert pos["entry_price"] == pytest.approx(entry_price)
+        assert pos["realized_pnl_usd"] == pytest.approx(old["pnl"])
+        assert pos["initial_margin_usd"] == old["margin"]
+        assert pos["trade_count"] == old["count"]
+        assert pos["status"] == ("ACTIVE" if old["size"] > 0.01 else "CLOSED")
+
+    assert result["a"]["base_token"]["symbol"] == "ETH"
+    assert result["b"]["side"] == "Short"
+    assert result["b"]["base_token"]["symbol"] == "BTC"
+
+
+def test_aggregate_orders_trades_by_timestamp():
+    """Shuffled input keeps totals and yields chronological trades per position"""
+    trades = _sample_trades()
+    expected = {p["position_key"]: p for p in aggregate_gmx_trades_to_positions(trades)}
+
+    shuffled = trades[:]
+    random.Random(7).shuffle(shuffled)
+    result = {p["position_key"]: p for p in aggregate_gmx_trades_to_positions(shuffled)}
+
+    for key, pos in result.items():
+        timestamps = [t["timestamp"] for t in pos["trades"]]
+        assert timestamps == sorted(timestamps)
+        assert pos["trades"] == expected[key]["trades"]
+        assert pos["position_value_usd"] == pytest.approx(expected[key]["position_value_usd"])
+        assert pos["entry_price"] == pytest.approx(expected[key]["entry_price"])
+        assert pos["realized_pnl_usd"] == pytest.approx(expected[key]["realized_pnl_usd"])
+
+
+def test_aggregate_initial_margin_uses_earliest_open():
+    """Initial margin comes from the earliest Open with collateral, not input order"""
+    trades = [
+        _trade("a", "Open", 100.0, 10.0, 500, collateral=99.0),
+        _trade("a", "Open", 100.0, 10.0, 100, collateral=0.0),
+        _trade("a", "Open", 100.0, 10.0, 200, collateral=20.0),
+    ]
+
+    [pos] = aggregate_gmx_trades_to_positions(trades)
+
+    assert pos["initial_margin_usd"] == 20.0
+    assert pos["leverage"] == pytest.approx(300.0 / 20.0)
+
+
+def test_aggregate_empty():
+    """No trades yields no positions"""
+    assert aggregate_gmx_trades_to_positions([]) == []
+
+
+def test_ratio_statistics_matches_statistics_module():
+    """Welford single pass agrees with the statistics module"""
+    rng = random.Random(11)
+    ratios = [0.004 + rng.random() * 1e-4 for _ in range(2000)]
+
+    mean, std, lo, hi = _ratio_statistics(ratios)
+
+    n = len(ratios)
+    assert mean == pytest.approx(statistics.fmean(ratios), rel=1e-12)
+    # Sample variance: pvariance rescaled by n / (n - 1)
+    assert std ** 2 == pytest.approx(statistics.pvariance(ratios) * n / (n - 1), rel=1e-9)
+    assert std == pytest.approx(statistics.stdev(ratios), rel=1e-9)
+    assert (lo, hi) == (min(ratios), max(ratios))
+
+
+def test_ratio_statistics_short_series():
+    """Empty and single-point series have zero spread"""
+    assert _ratio_statistics([]) == (0, 0, 0, 0)
+    assert _ratio_statistics([2.5]) == (2.5, 0, 2.5, 2.5)
+
+
+def test_find_threshold_breaches_runs():
+    """Each out-of-band run is one breach ending at the next in-band point"""
+    ratios = [1.0, 1.2, 1.3, 1.0, 0.8, 1.15, 1.0, 0.85]
+    ratio_data = [{"timestamp": 100 * (i + 1)} for i in range(len(ratios))]
+
+    breaches = _find_threshold_breaches(ratio_data, ratios, 1.0, 1.1, 0.9, to_ts=999)
+
+    assert len(breaches) == 3
+    above, crossing, ongoing = breaches
+    assert (above["start_timestamp"], above["end_timestamp"], above["direction"]) == (200, 400, "above")
+    assert above["peak_deviation"] == pytest.approx(0.3)
+    assert "ongoing" not in above
+    # Crossing straight from below to above stays one breach
+    assert (crossing["start_timestamp"], crossing["end_timestamp"], crossing["direction"]) == (500, 700, "below")
+    assert crossing["peak_deviation"] == pytest.approx(0.2)
+    assert (ongoing["start_timestamp"], ongoing["end_timestamp"], ongoing["direction"]) == (800, 999, "below")
+    assert ongoing["ongoing"] is True
+    assert ongoing["peak_deviation"] == pytest.approx(0.15)
+
+
+def test_find_threshold_breaches_in_band():
+    """A series that never leaves the band has no breaches"""
+    ratios = [1.0, 1.05, 0.95]
+    ratio_data = [{"timestamp": i} for i in range(3)]
+    assert _find_threshold_breaches(ratio_data, ratios, 1.0, 1.1, 0.9, to_ts=10) == []
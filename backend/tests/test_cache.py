@@ -1,5 +1,5 @@
 import pytest
-from backend.core.cache import CacheService, cache_key_for_wallet
+from backend.core.cache import CacheService, TTLCache, cache_key_for_wallet
 
 @pytest.mark.asyncio
 async def test_cache_set_get(cache_service):
@@ -34,3 +34,42 @@ def test_cache_key_generation():
 
     assert key.startswith("debank:wallet:0x742d35cc6634c0532925a3b844bc9e7595f0beb:")
     assert len(key) > 50  # Should have timestamp
+
+def test_ttl_cache_expiry():
+    """Test in-process TTL cache expiry and eviction"""
+    cache = TTLCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", {"x": 1})
+    cache.set("b", {"x": 2})
+    assert cache.get("a") == {"x": 1}
+
+    # Oldest entry is evicted when full
+    cache.set("c", {"x": 3})
+    assert cache.get("a") is None
+
+    expired = TTLCache(ttl_seconds=-1)
+    expired.set("a", {"x": 1})
+    assert expired.get("a") is None
+
+def test_ttl_cache_threaded():
+    """Test TTL cache stays bounded and consistent across worker threads"""
+    import threading
+
+    cache = TTLCache(ttl_seconds=60, max_entries=32)
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(5000):
+                cache.set((n, i), i)
+                cache.get((n, i - 1))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert len(cache._data) <= 32
@@ -0,0 +1,81 @@
+import httpx
+import pytest
+
+from backend.services.discovery import TransactionDiscoveryService
+
+WALLET = "0x742d35cc6634c0532925a3b844bc9e7595f0beb0"
+
+
+def _history_client(history, calls):
+    """httpx client serving all_history_list pages from an in-memory history"""
+    def handler(request):
+        params = request.url.params
+        chains = set(params["chain_ids"].split(","))
+        start_time = int(params.get("start_time") or 10**12)
+        rows = sorted(
+            (tx for tx in history if tx["chain"] in chains and tx["time_at"] < start_time),
+            key=lambda tx: tx["time_at"],
+            reverse=True
+        )
+        calls.append(params["chain_ids"])
+        return httpx.Response(200, json={"history_list": rows[:int(params["page_count"])]})
+
+    return httpx.AsyncClient(base_url="https://debank.test", transport=httpx.MockTransport(handler))
+
+
+def _history():
+    # A busy chain with one tx per second and a quiet one every 50 seconds
+    busy = [{"id": f"a{t}", "chain": "arb", "time_at": t} for t in range(1000, 1300)]
+    quiet = [{"id": f"e{t}", "chain": "eth", "time_at": t} for t in range(0, 1300, 50)]
+    return busy + quiet
+
+
+@pytest.mark.asyncio
+async def test_history_by_chain_small_wallet_single_call():
+    """A window covered by the first page costs one call"""
+    calls = []
+    history = [{"id": f"a{t}", "chain": "arb", "time_at": t} for t in range(5)]
+    service = TransactionDiscoveryService(client=_history_client(history, calls))
+
+    result = await service._fetch_history_by_chain(WALLET, ["arb", "eth"], None, None, 20, 10)
+
+    assert len(calls) == 1
+    assert result["exhausted"] is True
+    assert [tx["time_at"] for tx in result["transactions"]] == [4, 3, 2, 1, 0]
+    await service.client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_history_by_chain_budget_keeps_prefix():
+    """A spent budget yields a gap-free newest-first prefix within max_pages"""
+    calls = []
+    history = _history()
+    service = TransactionDiscoveryService(client=_history_client(history, calls))
+
+    result = await service._fetch_history_by_chain(WALLET, ["arb", "eth"], None, None, 20, 6)
+
+    assert len(calls) == 6
+    assert result["exhausted"] is False
+    times = [tx["time_at"] for tx in result["transactions"]]
+    assert times == sorted(times, reverse=True)
+    # Everything at or above the oldest kept row is present, on every chain
+    expected = sorted(
+        (tx["time_at"] for tx in history if tx["time_at"] >= times[-1]), reverse=True
+    )
+    assert times == expected
+    assert result["next_start_time"] == times[-1]
+    await service.client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_history_by_chain_full_budget_matches_history():
+    """With enough pages every chain is read to the end, seeded by the first page"""
+    calls = []
+    history = _history()
+    service = TransactionDiscoveryService(client=_history_client(history, calls))
+
+    result = await service._fetch_history_by_chain(WALLET, ["arb", "eth"], None, None, 20, 100)
+
+    assert result["exhausted"] is True
+    assert sorted(tx["id"] for tx in result["transactions"]) == sorted(tx["id"] for tx in history)
+    await service.client.aclose()
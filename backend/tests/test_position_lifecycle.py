@@ -0,0 +1,108 @@
+from backend.app.api.v1.position_lifecycle import (
+    _track_lifecycles,
+    process_positions_with_lifecycle_detection,
+    split_yield_position_into_lifecycles,
+)
+
+USDC = "0xaf88d065e77c8cc2239327c5edb3a432268e5831"
+VAULT = "0x1111111111111111111111111111111111111111"
+TOKEN_DICT = {
+    USDC: {"symbol": "USDC"},
+    VAULT: {"symbol": "vUSDC"},
+}
+
+
+def _deposit(time_at, amount):
+    return {
+        "time_at": time_at,
+        "sends": [{"token_id": USDC, "amount": amount}],
+        "receives": [{"token_id": VAULT, "amount": amount}],
+    }
+
+
+def _withdraw(time_at, amount):
+    return {
+        "time_at": time_at,
+        "sends": [{"token_id": VAULT, "amount": amount}],
+        "receives": [{"token_id": USDC, "amount": amount}],
+    }
+
+
+def _position(transactions):
+    return {
+        "id": "vault",
+        "type": "yield",
+        "protocol": "arb_vault",
+        "valueUsd": 100,
+        "transactions": transactions,
+    }
+
+
+def test_no_withdrawal_is_single_open_lifecycle():
+    """Deposits only skip the balance walk and stay one open lifecycle"""
+    txs = [_deposit(300, 5.0), _deposit(100, 10.0), _deposit(200, 2.5)]
+
+    [pos] = split_yield_position_into_lifecycles(_position(txs), TOKEN_DICT)
+
+    assert pos["id"] == "vault_lifecycle_0"
+    assert pos["status"] == "open"
+    assert [tx["time_at"] for tx in pos["transactions"]] == [100, 200, 300]
+    assert pos["openedAt"] == 100
+    assert "closedAt" not in pos
+    assert pos["valueUsd"] == 100
+    assert "USDC" in pos["displayName"]
+
+    # Fast path matches the full balance walk
+    [walked] = _track_lifecycles(sorted(txs, key=lambda tx: tx["time_at"]), TOKEN_DICT, {})
+    assert walked["status"] == "open"
+    assert walked["asset"] == "USDC"
+    assert walked["transactions"] == pos["transactions"]
+
+
+def test_partial_withdrawal_stays_open():
+    """A withdrawal that leaves a balance does not close the lifecycle"""
+    txs = [_deposit(100, 100.0), _withdraw(200, 40.0)]
+
+    [pos] = split_yield_position_into_lifecycles(_position(txs), TOKEN_DICT)
+
+    assert pos["status"] == "open"
+    assert pos["transactionCount"] == 2
+
+
+def test_full_withdrawal_starts_new_lifecycle():
+    """Withdrawing the full balance closes it; the next deposit opens another"""
+    txs = [
+        _deposit(100, 100.0),
+        _withdraw(200, 40.0),
+        _withdraw(300, 60.0),
+        _deposit(400, 25.0),
+    ]
+
+    closed, reopened = split_yield_position_into_lifecycles(_position(txs), TOKEN_DICT)
+
+    assert closed["status"] == "closed"
+    assert (closed["openedAt"], closed["closedAt"]) == (100, 300)
+    assert closed["transactionCount"] == 3
+    assert closed["valueUsd"] == 0
+    assert closed["displayName"].endswith("[Closed]")
+    assert reopened["status"] == "open"
+    assert reopened["openedAt"] == 400
+    assert reopened["id"] == "vault_lifecycle_1"
+
+
+def test_decimal_balance_closes_exactly():
+    """Amounts that drift as floats still net to zero and close the lifecycle"""
+    txs = [_deposit(100, 0.3), _withdraw(200, 0.1), _withdraw(300, 0.2)]
+
+    [pos] = split_yield_position_into_lifecycles(_position(txs), TOKEN_DICT)
+
+    assert pos["status"] == "closed"
+
+
+def test_non_yield_positions_pass_through():
+    """LP and perp positions are returned untouched"""
+    lp = {"id": "lp", "type": "lp", "transactions": [_deposit(100, 1.0)]}
+
+    result = process_positions_with_lifecycle_detection([lp], TOKEN_DICT)
+
+    assert result == [lp]
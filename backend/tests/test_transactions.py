@@ -0,0 +1,153 @@
+import base64
+import heapq
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from backend.app.api.v1.transactions import (
+    _decode_cursor,
+    _encode_cursor,
+    _keyset_key,
+    _keyset_page,
+    get_wallet_transactions,
+)
+
+WALLET = "0x742d35cc6634c0532925a3b844bc9e7595f0beb0"
+
+
+class FakeDiscovery:
+    """Discovery service stand-in returning a fixed transaction list"""
+    response_cache = None
+
+    def __init__(self, transactions):
+        self.transactions = transactions
+        self.calls = []
+
+    async def discover_transactions(self, **kwargs):
+        self.calls.append(kwargs)
+        return {
+            "transactions": self.transactions,
+            "token_dict": {},
+            "project_dict": {},
+            "summary": {"total": len(self.transactions), "byChain": {}, "byProject": {}},
+            "chains_queried": ["arb"],
+            "chains_with_data": ["arb"],
+            "cache": {},
+        }
+
+
+def _tx(tx_id, time_at, project="uniswap3"):
+    return {"id": tx_id, "time_at": time_at, "chain": "arb", "project_id": project}
+
+
+def _request():
+    return Request({"type": "http", "headers": []})
+
+
+async def _get(discovery, cursor="", limit=2, project=None):
+    response = await get_wallet_transactions(
+        address=WALLET,
+        request=_request(),
+        since="2020-01-01",
+        until="2030-01-01",
+        chain=None,
+        project=project,
+        force_refresh=False,
+        page=1,
+        limit=limit,
+        cursor=cursor,
+        discovery=discovery,
+    )
+    return orjson.loads(response.body)["data"]
+
+
+async def _walk(discovery, limit, project=None):
+    """Follow nextCursor from the first page until it runs out"""
+    seen, cursor = [], ""
+    while cursor is not None:
+        data = await _get(discovery, cursor=cursor, limit=limit, project=project)
+        seen.extend(tx["id"] for tx in data["transactions"])
+        cursor = data["pagination"]["nextCursor"]
+        assert data["pagination"]["hasMore"] is (cursor is not None)
+    return seen
+
+
+def test_cursor_roundtrip():
+    """Encoded cursors decode back to the (time_at, id) key"""
+    tx = _tx("0xabc:1", 1700000000.5)
+    assert _decode_cursor(_encode_cursor(tx)) == _keyset_key(tx)
+    assert _decode_cursor(_encode_cursor({"time_at": 1700000000})) == (1700000000.0, "")
+
+
+def test_decode_invalid_cursor():
+    """Garbage cursors raise ValueError"""
+    with pytest.raises(ValueError):
+        _decode_cursor("not-a-cursor")
+    for bad in ("inf:0xa", "nan:0xa"):
+        with pytest.raises(ValueError):
+            _decode_cursor(base64.urlsafe_b64encode(bad.encode()).decode())
+
+
+def test_keyset_page_matches_nlargest():
+    """Bounded heap returns the same rows as nlargest, with an exact count"""
+    txs = [_tx(f"0x{i % 7}", 100 + i % 5) for i in range(40)]
+    cursor_key = (103.0, "0x3")
+
+    rows, total = _keyset_page(txs, cursor_key, 6)
+
+    older = [tx for tx in txs if _keyset_key(tx) < cursor_key]
+    assert total == len(older)
+    assert rows == heapq.nlargest(6, older, key=_keyset_key)
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_cover_ties():
+    """Transactions sharing a time_at are split across pages without loss"""
+    txs = [_tx("0xa", 100), _tx("0xb", 200), _tx("0xc", 200), _tx("0xd", 200), _tx("0xe", 300)]
+    discovery = FakeDiscovery(txs)
+
+    assert await _walk(discovery, limit=2) == ["0xe", "0xd", "0xc", "0xb", "0xa"]
+
+
+@pytest.mark.asyncio
+async def test_cursor_last_page():
+    """The final page has no nextCursor and reports the rows left"""
+    discovery = FakeDiscovery([_tx("0xa", 100), _tx("0xb", 200), _tx("0xc", 300)])
+
+    first = await _get(discovery, limit=2)
+    assert first["pagination"]["total"] == 3
+    last = await _get(discovery, cursor=first["pagination"]["nextCursor"], limit=2)
+
+    assert [tx["id"] for tx in last["transactions"]] == ["0xa"]
+    assert last["pagination"]["total"] == 1
+    assert last["pagination"]["nextCursor"] is None
+    assert last["pagination"]["hasMore"] is False
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_400():
+    """An undecodable cursor is a client error"""
+    discovery = FakeDiscovery([_tx("0xa", 100)])
+
+    for cursor in ("not-a-cursor", base64.urlsafe_b64encode(b"inf:x").decode()):
+        with pytest.raises(HTTPException) as exc:
+            await _get(discovery, cursor=cursor)
+        assert exc.value.status_code == 400
+
+    assert discovery.calls == []
+
+
+@pytest.mark.asyncio
+async def test_cursor_with_project_filter():
+    """Cursor paging only walks the filtered project"""
+    txs = [
+        _tx("0xa", 100), _tx("0xb", 200, project="arb_gmx2"), _tx("0xc", 300),
+        _tx("0xd", 400, project="arb_gmx2"), _tx("0xe", 500), _tx("0xf", 600),
+    ]
+    discovery = FakeDiscovery(txs)
+
+    assert await _walk(discovery, limit=2, project="uniswap3") == ["0xf", "0xe", "0xc", "0xa"]
+    data = await _get(discovery, limit=2, project="arb_gmx2")
+    assert data["summary"]["byProject"] == {"arb_gmx2": 2}
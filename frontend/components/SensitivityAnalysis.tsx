@@ -117,7 +117,16 @@ export function SensitivityAnalysis({
       const result = await response.json();
 
       if (result.status === "success") {
-        setData(result.data.time_series);
+        // Large series come back without deviation_pct; derive it from initial_ratio
+        const initialRatio: number = result.data.statistics.initial_ratio;
+        const scale = initialRatio > 0 ? 100 / initialRatio : 0;
+        setData(
+          result.data.time_series.map((point: PriceRatioDataPoint) =>
+            point.deviation_pct === undefined
+              ? { ...point, deviation_pct: (point.ratio - initialRatio) * scale }
+              : point
+          )
+        );
         setStats(result.data.statistics);
         setThresholdAnalysis(result.data.threshold_analysis);
       } else {
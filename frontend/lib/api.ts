@@ -90,10 +90,12 @@ export interface TransactionsResponse {
       project: string | null;
     };
     pagination: {
-      page: number;
+      page?: number;        // page/limit mode
       limit: number;
       total: number;
-      totalPages: number;
+      totalPages?: number;  // page/limit mode
+      cursor?: string;      // cursor mode
+      nextCursor?: string | null;  // cursor mode
       hasMore: boolean;
     };
     summary: {
@@ -120,6 +122,7 @@ export interface FetchTransactionsParams {
   project?: string; // arb_gmx2, uniswap3, etc.
   page?: number;
   limit?: number;
+  cursor?: string;  // Keyset cursor ("" for the first page); replaces page
   forceRefresh?: boolean;  // Clear cache and refetch
 }
 
@@ -136,6 +139,7 @@ export async function fetchTransactions(
   if (params.project) searchParams.set('project', params.project);
   if (params.page) searchParams.set('page', params.page.toString());
   if (params.limit) searchParams.set('limit', params.limit.toString());
+  if (params.cursor !== undefined) searchParams.set('cursor', params.cursor);
   if (params.forceRefresh) searchParams.set('force_refresh', 'true');
   
   const queryString = searchParams.toString();